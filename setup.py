@@ -24,6 +24,11 @@ setup(
         "ipykernel>=5.3.0",
         "ffmpeg-python>=0.2.0",
     ],
+    entry_points={
+        "console_scripts": [
+            "ascii-art-generator=ascii_art_generator.cli:main",
+        ],
+    },
     include_package_data=True,
     package_data={
         "ascii_art_generator": ["ascii_images/*.png"],
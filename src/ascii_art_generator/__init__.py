@@ -1,16 +1,34 @@
-from .ascii_art_generator_image import generate_ascii_art
-from .ascii_art_generator_video import convert_video_to_ascii
+from .ascii_art_generator_image import generate_ascii_art, generate_ascii_art_progressive
+from .ascii_art_generator_video import (VideoOutputSpec, convert_video_to_ascii, convert_video_to_ascii_multi,
+                                        validate_video_job)
+from .ascii_art_generator_service import ConversionService
+from .ascii_art_generator_async import AsyncAsciiConverter
+from .ascii_art_generator_autotune import ThroughputController, calibrate_video_settings, convert_video_to_ascii_tuned
 from .utils_ascii import generate_ascii_images, get_ascii_char, get_ascii_code
 from .utils_compute_stats import compute_average_brightness
+from .utils_metrics import ConversionStats
+from .utils_glyph_video import render_glyph_video, glyph_video_to_text
 
 __version__ = "1.0.0"
 __author__ = "Jannik Wege"
 
 __all__ = [
     'generate_ascii_art',
+    'generate_ascii_art_progressive',
     'convert_video_to_ascii', 
+    'convert_video_to_ascii_multi',
+    'VideoOutputSpec',
+    'validate_video_job',
+    'ConversionService',
+    'AsyncAsciiConverter',
+    'ThroughputController',
+    'calibrate_video_settings',
+    'convert_video_to_ascii_tuned',
     'generate_ascii_images',
     'get_ascii_char',
     'get_ascii_code',
-    'compute_average_brightness'
+    'compute_average_brightness',
+    'ConversionStats',
+    'render_glyph_video',
+    'glyph_video_to_text'
 ]
\ No newline at end of file
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
+
+from .ascii_art_generator_image import ascii_art_from_array, generate_ascii_art
+from .ascii_art_generator_video import convert_video_to_ascii
+from .utils_metrics import ConversionStats
+
+
+class AsyncAsciiConverter:
+    """
+    asyncio front end for image and video conversion.
+
+    CPU work runs on a managed executor so the event loop stays responsive, and at most ``max_concurrency``
+    conversions run at the same time; further calls wait for a free slot (backpressure).
+    Use it as ``async with AsyncAsciiConverter() as converter: ...`` or call ``await converter.aclose()``
+    (``close()`` outside of an event loop) when done.
+
+    Args:
+        max_concurrency (int): Maximum number of conversions running at once (default: number of CPUs)
+        executor (concurrent.futures.Executor): Optional executor for image jobs, e.g. a ProcessPoolExecutor.
+                                                Video jobs always run on the internal thread pool because they
+                                                need a shared cancel event and stream progress back (default: None)
+    """
+
+    def __init__(self, max_concurrency=None, executor=None):
+        if max_concurrency is None:
+            max_concurrency = os.cpu_count() or 1
+        assert max_concurrency > 0, "max_concurrency must be greater than 0"
+        self.max_concurrency = max_concurrency
+        self._thread_executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='ascii_art')
+        self._executor = executor or self._thread_executor
+        self._semaphore = None
+
+    # Maximum number of progress messages of a video job waiting for the consumer, a slower consumer pauses the worker
+    progress_queue_size = 16
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """ Shut down the internal thread pool without blocking the event loop, running conversions are finished first. """
+        await asyncio.to_thread(self._thread_executor.shutdown, wait=True)
+
+    def close(self):
+        """ Blocking version of ``aclose`` for callers without a running event loop. """
+        self._thread_executor.shutdown(wait=True)
+
+    def _slots(self):
+        # Created lazily so the semaphore belongs to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def generate_ascii_art(self, image_path, **kwargs):
+        """
+        Async version of ``generate_ascii_art``, see there for the keyword arguments.
+        Plotting is disabled unless ``plot_enabled=True`` is passed explicitly.
+        Cancelling the awaiting task does not interrupt a conversion that already started, its result is dropped.
+        Returns:
+            numpy.ndarray: The generated ASCII art image
+        """
+        kwargs.setdefault('plot_enabled', False)
+        async with self._slots():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(generate_ascii_art, image_path, **kwargs))
+
+    async def ascii_art_from_array(self, image, **kwargs):
+        """
+        Async version of ``ascii_art_from_array``, see there for the keyword arguments.
+        Returns:
+            numpy.ndarray: The generated ASCII art image
+        """
+        async with self._slots():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(ascii_art_from_array, image, **kwargs))
+
+    async def iter_video_to_ascii(self, input_video_path, output_video_path, **kwargs):
+        """
+        Convert a video to ASCII art and stream the progress, see ``convert_video_to_ascii`` for the keyword arguments.
+
+        Every converted frame produces a progress dictionary (see ``ConversionStats.progress``). The last item
+        additionally contains ``'done': True``, ``'success'`` and the full ``'stats'`` summary.
+        At most ``progress_queue_size`` messages are buffered; when the consumer falls behind, the conversion
+        waits for it instead of piling up progress messages.
+        If the consuming task is cancelled or the iterator is closed (``await iterator.aclose()``), the conversion is
+        stopped after the current frame and the video capture and writer are released before the iterator finishes.
+        Breaking out of an ``async for`` loop alone does not close an async generator, so wrap the iterator in
+        ``contextlib.aclosing`` to stop the conversion on ``break``::
+
+            async with aclosing(converter.iter_video_to_ascii(input_path, output_path)) as progress_updates:
+                async for progress in progress_updates:
+                    if progress['frames_written'] >= 100:
+                        break
+
+        Yields:
+            dict: Progress of the conversion
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.progress_queue_size)
+        cancel_event = threading.Event()
+        end_markers = []
+
+        stats = kwargs.pop('stats', None) or ConversionStats()
+        user_callback = stats.callback
+
+        def on_frame(frame_stats):
+            put = asyncio.run_coroutine_threadsafe(queue.put(frame_stats.progress()), loop)
+            # Wait for room in the queue (backpressure), unless the consumer stopped listening
+            while not cancel_event.is_set():
+                try:
+                    put.result(timeout=0.1)
+                    break
+                except FutureTimeoutError:
+                    pass
+            else:
+                put.cancel()
+            if user_callback is not None:
+                user_callback(frame_stats)
+
+        stats.callback = on_frame
+        kwargs.setdefault('show_progress', False)
+        kwargs.setdefault('verbose', False)
+
+        async with self._slots():
+            future = loop.run_in_executor(self._thread_executor, partial(
+                convert_video_to_ascii, input_video_path, output_video_path, stats=stats, cancel_event=cancel_event, **kwargs))
+            # Runs on the event loop once the worker is done, after all progress messages it queued
+            future.add_done_callback(lambda _: end_markers.append(loop.create_task(queue.put(None))))
+            try:
+                while True:
+                    progress = await queue.get()
+                    if progress is None:
+                        break
+                    yield progress
+                success = await future
+                yield dict(stats.progress(), done=True, success=success, stats=stats.summary())
+            finally:
+                if not future.done():
+                    cancel_event.set()
+                    # asyncio.wait does not propagate a second cancellation into the worker future
+                    await asyncio.wait([future])
+                for end_marker in end_markers:
+                    end_marker.cancel()
+                stats.callback = user_callback
+
+    async def convert_video_to_ascii(self, input_video_path, output_video_path, **kwargs):
+        """
+        Async version of ``convert_video_to_ascii``, see there for the keyword arguments.
+        Cancelling the awaiting task stops the conversion after the current frame.
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        success = False
+        async for progress in self.iter_video_to_ascii(input_video_path, output_video_path, **kwargs):
+            if progress.get('done'):
+                success = progress['success']
+        return success
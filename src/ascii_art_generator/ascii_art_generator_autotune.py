@@ -0,0 +1,398 @@
+import json
+import os
+import platform
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from .ascii_art_generator_image import get_aspect_ratio_of_ascii_image
+from .ascii_art_generator_video import (FrameBatchPipeline, convert_frame_batch, convert_video_to_ascii,
+                                        open_glyph_video_writer)
+from .utils_glyph_video import GLYPH_VIDEO_EXTENSION
+from .utils_metrics import ConversionStats
+from .utils_tile_stats import get_tile_size
+
+# Fractions of the requested num_sub_images_width tried during calibration
+CALIBRATION_WIDTH_FRACTIONS = (1.0, 0.75, 0.5, 0.35, 0.25)
+
+
+class ThroughputController:
+    """
+    Adapt batch size and ASCII resolution during a video conversion to keep up with a target frame rate.
+
+    Pass an instance as ``controller`` to ``convert_video_to_ascii``. After every batch the measured rate over the
+    last ``window_frames`` frames is compared to ``target_fps``: when too slow, the batch size is doubled up to
+    ``max_batch_size`` first and then ``num_sub_images_width`` is lowered; when there is enough headroom the width
+    is raised again, never above ``max_width``. Every change is recorded in ``history``.
+
+    Args:
+        target_fps (float): Converted frames per second to reach
+        num_sub_images_width (int): Initial number of sub-images in width dimension
+        batch_size (int): Initial number of frames converted together (default: 1)
+        max_width (int): Highest width the controller may raise to (default: num_sub_images_width)
+        min_width (int): Lowest width the controller may fall back to (default: a quarter of max_width)
+        max_batch_size (int): Largest batch size the controller may use (default: 32)
+        adapt_width (bool): Whether the width may change, must be False for glyph-index output (default: True)
+        window_frames (int): Number of frames measured before each decision (default: 24)
+        tolerance (float): Relative deviation from target_fps tolerated without a change (default: 0.1)
+    """
+
+    def __init__(self, target_fps, num_sub_images_width, batch_size=1, max_width=None, min_width=None,
+                 max_batch_size=32, adapt_width=True, window_frames=24, tolerance=0.1):
+        assert target_fps > 0, "target_fps must be greater than 0"
+        assert num_sub_images_width > 0, "num_sub_images_width must be greater than 0"
+        assert 0 < batch_size <= max_batch_size, "batch_size must be between 1 and max_batch_size"
+        self.target_fps = target_fps
+        self.num_sub_images_width = num_sub_images_width
+        self.batch_size = batch_size
+        self.max_width = max(max_width or num_sub_images_width, num_sub_images_width)
+        self.min_width = min(min_width or max(1, self.max_width // 4), num_sub_images_width)
+        self.max_batch_size = max_batch_size
+        self.adapt_width = adapt_width
+        self.window_frames = window_frames
+        self.tolerance = tolerance
+        self.measured_fps = None
+        self.frames_seen = 0
+        self.history = []
+        self.start()
+
+    def start(self):
+        """ Restart the rate measurement, called by ``convert_video_to_ascii`` right before the first frame. """
+        self._last_time = time.perf_counter()
+        self._window_frames = 0
+        self._window_seconds = 0.0
+
+    def update(self, num_frames):
+        """
+        Report that another batch of ``num_frames`` frames was handed to the converter.
+        Returns:
+            tuple: (num_sub_images_width, batch_size) to use for the next batch
+        """
+        now = time.perf_counter()
+        self._window_seconds += now - self._last_time
+        self._window_frames += num_frames
+        self._last_time = now
+        self.frames_seen += num_frames
+        if self._window_frames < self.window_frames or self._window_seconds <= 0:
+            return self.num_sub_images_width, self.batch_size
+
+        fps = self._window_frames / self._window_seconds
+        self.measured_fps = fps
+        self._window_frames = 0
+        self._window_seconds = 0.0
+
+        width, batch_size = self.num_sub_images_width, self.batch_size
+        if fps < self.target_fps * (1 - self.tolerance):
+            if batch_size < self.max_batch_size:
+                batch_size = min(self.max_batch_size, batch_size * 2)
+            elif self.adapt_width and width > self.min_width:
+                # The conversion cost grows about linearly with the width, at most halve it per step
+                width = max(self.min_width, width // 2, min(width - 1, int(width * fps / self.target_fps)))
+        elif self.adapt_width and width < self.max_width:
+            wider = min(self.max_width, max(width + 1, int(width * 1.15)))
+            # Only go up if the expected rate at the new width still clears the target
+            if fps * width / wider >= self.target_fps * (1 + self.tolerance):
+                width = wider
+
+        if (width, batch_size) != (self.num_sub_images_width, self.batch_size):
+            self.num_sub_images_width, self.batch_size = width, batch_size
+            self.history.append({'frame': self.frames_seen, 'measured_fps': fps,
+                                 'num_sub_images_width': width, 'batch_size': batch_size})
+        return self.num_sub_images_width, self.batch_size
+
+
+class _NullWriter:
+    """ Writer discarding every frame, used to time the conversion alone. """
+
+    def write(self, frame):
+        pass
+
+
+def host_info():
+    """
+    Describe the current host, e.g. to cache calibration results per host type.
+    Returns:
+        dict: Host key, operating system, machine, processor, CPU count and library versions
+    """
+    cpu_count = os.cpu_count() or 1
+    return {
+        'key': f"{platform.system()}-{platform.machine()}-{cpu_count}cpu",
+        'system': platform.system(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': cpu_count,
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def _is_valid_width(frame_width, num_sub_images_width):
+    try:
+        get_tile_size(frame_width, num_sub_images_width, get_aspect_ratio_of_ascii_image())
+    except AssertionError:
+        return False
+    return True
+
+
+def _time_conversion(sample, ascii_images_dir, num_sub_images_width, batch_size, num_workers, glyph_output):
+    """ Convert the sample like convert_video_to_ascii would, without decoding and encoding, and return frames/sec. """
+    pipeline = FrameBatchPipeline(_NullWriter(), ascii_images_dir, glyph_output, num_workers)
+    try:
+        start = time.perf_counter()
+        for index in range(0, len(sample), batch_size):
+            pipeline.submit(sample[index:index + batch_size], num_sub_images_width)
+        pipeline.flush()
+        return len(sample) / max(time.perf_counter() - start, 1e-9)
+    finally:
+        pipeline.close()
+
+
+def _time_encoding(sample, fps, ascii_images_dir, num_sub_images_width, output_extension):
+    """ Write the converted sample with the writer of the output format and return frames/sec. """
+    glyph_output = output_extension == GLYPH_VIDEO_EXTENSION
+    _, height, width = sample.shape
+    frames = convert_frame_batch(sample, ascii_images_dir, num_sub_images_width, render=not glyph_output)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, 'calibration' + output_extension)
+        if glyph_output:
+            out = open_glyph_video_writer(output_path, fps, (width, height), num_sub_images_width, ascii_images_dir)
+        else:
+            out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height), isColor=False)
+        try:
+            start = time.perf_counter()
+            for frame in frames:
+                out.write(frame)
+            out.release()
+            return len(frames) / max(time.perf_counter() - start, 1e-9)
+        finally:
+            out.release()
+
+
+def calibrate_video_settings(input_video_path, output_extension='.mp4', target_fps=None, time_budget=None,
+                             num_sub_images_width=100, start_time=0.0, end_time=None, speed_multiplier=1.0,
+                             ascii_images_dir=None, candidate_widths=None, candidate_batch_sizes=(1, 4, 8, 16),
+                             candidate_workers=None, sample_frames=32):
+    """
+    Measure decode, conversion and encode rates on a short sample of a video and pick the settings of
+    ``convert_video_to_ascii`` that reach a target frame rate or wall-clock budget on this host.
+
+    The sample is decoded once. Conversion is timed for every candidate width and batch size on one worker,
+    then for the fastest batch size of every width with more workers. The frame rate of the whole pipeline is
+    estimated from the per-stage rates (decoding and encoding run on the calling thread, conversion overlaps with
+    them when more than one worker is used). The highest width reaching the target wins, ties go to fewer workers
+    and smaller batches. Without a target the largest width is kept and the fastest batch size and worker count
+    are picked. If no candidate reaches the target, the fastest one is picked.
+
+    Args:
+        input_video_path (str): Path to the input video file
+        output_extension (str): Extension of the planned output, '.mp4', '.avi' or '.agv' (default: '.mp4')
+        target_fps (float): Converted frames per second to reach (default: None)
+        time_budget (float): Wall-clock seconds for the whole conversion, turned into a target frame rate from
+                             the number of frames to convert; the stricter of both targets is used (default: None)
+        num_sub_images_width (int): Requested ASCII resolution, the upper bound of the default candidates (default: 100)
+        start_time (float): Start time in seconds, the sample is taken from here (default: 0.0)
+        end_time (float): End time in seconds (default: None - full video)
+        speed_multiplier (float): Speed multiplier as passed to convert_video_to_ascii (default: 1.0)
+        ascii_images_dir (str): Directory containing ASCII character images (default: package ascii_images)
+        candidate_widths (list): Widths to try (default: fractions of num_sub_images_width, see CALIBRATION_WIDTH_FRACTIONS)
+        candidate_batch_sizes (tuple): Batch sizes to try (default: (1, 4, 8, 16))
+        candidate_workers (tuple): Worker counts to try (default: 1, 2 and 4, limited to the number of CPUs)
+        sample_frames (int): Number of frames decoded and converted per measurement (default: 32)
+    Returns:
+        dict: JSON-serializable report with the chosen 'settings' (num_sub_images_width, batch_size, num_workers),
+              'estimated_fps', 'target_fps', 'meets_target', the measured 'rates', all 'candidates', 'host' and 'source'
+    """
+    if ascii_images_dir is None:
+        ascii_images_dir = os.path.join(os.path.dirname(__file__), 'ascii_images')
+    assert os.path.exists(input_video_path), f"Input video file does not exist: {input_video_path}"
+    assert os.path.exists(ascii_images_dir), f"ASCII images directory does not exist: {ascii_images_dir}"
+    assert output_extension in ('.mp4', '.avi', GLYPH_VIDEO_EXTENSION), "Output extension must be .mp4, .avi or .agv"
+    assert target_fps is None or target_fps > 0, "target_fps must be greater than 0"
+    assert time_budget is None or time_budget > 0, "time_budget must be greater than 0"
+    assert speed_multiplier >= 1.0, "Speed multiplier must be greater than 1.0. Slowing down videos is not supported."
+    assert sample_frames > 0, "sample_frames must be greater than 0"
+    calibration_start = time.perf_counter()
+    glyph_output = output_extension == GLYPH_VIDEO_EXTENSION
+
+    cap = cv2.VideoCapture(input_video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video file: {input_video_path}")
+    try:
+        fps = int(cap.get(cv2.CAP_PROP_FPS))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if end_time is None:
+            end_time = total_frames / fps
+        start_frame = int(start_time * fps)
+        end_frame = min(int(end_time * fps), total_frames - 1)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+        # Decode the sample once, the same way convert_video_to_ascii does
+        frames = []
+        decode_start = time.perf_counter()
+        while len(frames) < sample_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        decode_seconds = time.perf_counter() - decode_start
+    finally:
+        cap.release()
+    if not frames:
+        raise ValueError(f"Could not read any frames from: {input_video_path}")
+    sample = np.stack(frames)
+
+    step = int(speed_multiplier)
+    frames_to_convert = len(range(start_frame, end_frame + 1, step))
+    if time_budget is not None:
+        budget_fps = frames_to_convert / time_budget
+        target_fps = budget_fps if target_fps is None else max(target_fps, budget_fps)
+    # Every converted frame also pays for decoding the frames skipped by the speed multiplier
+    decode_fps = len(sample) / max(decode_seconds, 1e-9) / step
+
+    if candidate_widths is None:
+        candidate_widths = [int(round(num_sub_images_width * fraction)) for fraction in CALIBRATION_WIDTH_FRACTIONS]
+    candidate_widths = sorted({w for w in candidate_widths if w > 0 and _is_valid_width(width, w)}, reverse=True)
+    assert candidate_widths, f"No candidate width is valid for frames of width {width}"
+    candidate_batch_sizes = sorted({b for b in candidate_batch_sizes if 0 < b <= len(sample)}) or [len(sample)]
+    if candidate_workers is None:
+        candidate_workers = [w for w in (1, 2, 4) if w <= (os.cpu_count() or 1)]
+    candidate_workers = sorted({w for w in candidate_workers if w > 0}) or [1]
+
+    # Load the glyph atlas of every width up front so the timings only contain the conversion itself
+    for candidate_width in candidate_widths:
+        convert_frame_batch(sample[:1], ascii_images_dir, candidate_width, render=not glyph_output)
+
+    encode_fps = _time_encoding(sample, fps, ascii_images_dir, candidate_widths[0], output_extension)
+    main_thread_seconds = 1 / decode_fps + 1 / encode_fps
+
+    candidates = []
+    for candidate_width in candidate_widths:
+        batch_rates = {batch_size: _time_conversion(sample, ascii_images_dir, candidate_width, batch_size, 1, glyph_output)
+                       for batch_size in candidate_batch_sizes}
+        best_batch_size = max(batch_rates, key=batch_rates.get)
+        for num_workers in candidate_workers:
+            if num_workers == 1:
+                rates = batch_rates
+            else:
+                rates = {best_batch_size: _time_conversion(sample, ascii_images_dir, candidate_width, best_batch_size,
+                                                           num_workers, glyph_output)}
+            for batch_size, convert_fps in rates.items():
+                if num_workers == 1:
+                    estimated_fps = 1 / (main_thread_seconds + 1 / convert_fps)
+                else:
+                    estimated_fps = 1 / max(main_thread_seconds, 1 / convert_fps)
+                candidates.append({'num_sub_images_width': candidate_width, 'batch_size': batch_size,
+                                   'num_workers': num_workers, 'convert_fps': convert_fps, 'estimated_fps': estimated_fps})
+
+    meeting = [c for c in candidates if target_fps is not None and c['estimated_fps'] >= target_fps]
+    if meeting:
+        best = max(meeting, key=lambda c: (c['num_sub_images_width'], -c['num_workers'], -c['batch_size']))
+    elif target_fps is None:
+        widest = [c for c in candidates if c['num_sub_images_width'] == candidate_widths[0]]
+        best = max(widest, key=lambda c: c['estimated_fps'])
+    else:
+        best = max(candidates, key=lambda c: c['estimated_fps'])
+
+    return {
+        'settings': {key: best[key] for key in ('num_sub_images_width', 'batch_size', 'num_workers')},
+        'estimated_fps': best['estimated_fps'],
+        'target_fps': target_fps,
+        'meets_target': target_fps is None or best['estimated_fps'] >= target_fps,
+        'estimated_seconds': frames_to_convert / best['estimated_fps'],
+        'rates': {'decode_fps': decode_fps, 'encode_fps': encode_fps},
+        'candidates': candidates,
+        'host': host_info(),
+        'source': {'width': width, 'height': height, 'fps': fps, 'frames_to_convert': frames_to_convert,
+                   'sample_frames': len(sample), 'output_extension': output_extension},
+        'calibration_seconds': time.perf_counter() - calibration_start,
+    }
+
+
+def _calibration_cache_key(host, source, num_sub_images_width, target_fps):
+    target = 'max' if target_fps is None else f"{target_fps:.2f}"
+    return (f"{host['key']}|{source['width']}x{source['height']}|{source['output_extension']}"
+            f"|w{num_sub_images_width}|fps{target}")
+
+
+def convert_video_to_ascii_tuned(input_video_path, output_video_path, target_fps=None, time_budget=None,
+                                 num_sub_images_width=100, adapt=True, calibration_cache=None, sample_frames=32,
+                                 stats=None, **kwargs):
+    """
+    Calibrate the settings for this host and source, then convert the video with them and keep adapting
+    batch size and width during the run (see ThroughputController).
+    Args:
+        input_video_path (str): Path to the input video file
+        output_video_path (str): Path where the ASCII video will be saved (.mp4, .avi or .agv)
+        target_fps (float): Converted frames per second to reach (default: None)
+        time_budget (float): Wall-clock seconds for the whole conversion (default: None)
+        num_sub_images_width (int): Requested ASCII resolution, never exceeded (default: 100)
+        adapt (bool): Whether to adapt the settings during the run when a target is given (default: True)
+        calibration_cache (str): Optional JSON file storing calibration reports per host type, source resolution,
+                                 output format, width and target; a matching entry skips the calibration (default: None)
+        sample_frames (int): Number of frames used for the calibration (default: 32)
+        stats (ConversionStats): Optional stats object of the conversion run (default: None)
+        **kwargs: Further arguments of convert_video_to_ascii, e.g. start_time, end_time or compress_output.
+                  batch_size, num_workers and controller are chosen by the calibration and cannot be passed
+    Returns:
+        tuple: (True if successful, report of calibrate_video_settings extended by the measured 'run')
+    """
+    tuned_options = sorted(set(kwargs) & {'batch_size', 'num_workers', 'controller'})
+    assert not tuned_options, f"{', '.join(tuned_options)} are set by the calibration, use convert_video_to_ascii to choose them"
+    output_extension = os.path.splitext(output_video_path)[1].lower()
+    calibration_options = {key: kwargs[key] for key in ('start_time', 'end_time', 'speed_multiplier', 'ascii_images_dir')
+                           if key in kwargs}
+
+    cache = {}
+    report = None
+    if calibration_cache is not None and os.path.exists(calibration_cache):
+        with open(calibration_cache) as f:
+            cache = json.load(f)
+        cap = cv2.VideoCapture(input_video_path)
+        source = {'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                  'output_extension': output_extension}
+        cap.release()
+        # A time budget depends on the clip length, only fixed frame-rate targets are looked up
+        if time_budget is None:
+            report = cache.get(_calibration_cache_key(host_info(), source, num_sub_images_width, target_fps))
+    if report is None:
+        report = calibrate_video_settings(input_video_path, output_extension, target_fps, time_budget, num_sub_images_width,
+                                          sample_frames=sample_frames, **calibration_options)
+        report['cached'] = False
+        if calibration_cache is not None and time_budget is None:
+            cache[_calibration_cache_key(report['host'], report['source'], num_sub_images_width, target_fps)] = report
+            with open(calibration_cache, 'w') as f:
+                json.dump(cache, f, indent=2)
+    else:
+        report['cached'] = True
+
+    settings = report['settings']
+    controller = None
+    if adapt and report['target_fps'] is not None:
+        controller = ThroughputController(report['target_fps'], settings['num_sub_images_width'], settings['batch_size'],
+                                          max_width=num_sub_images_width, max_batch_size=max(32, settings['batch_size']),
+                                          adapt_width=output_extension != GLYPH_VIDEO_EXTENSION)
+    if stats is None:
+        stats = ConversionStats()
+    success = convert_video_to_ascii(input_video_path, output_video_path, num_sub_images_width=settings['num_sub_images_width'],
+                                     batch_size=settings['batch_size'], num_workers=settings['num_workers'],
+                                     controller=controller, stats=stats, **kwargs)
+
+    summary = stats.summary()
+    report['run'] = {
+        'success': success,
+        'elapsed': summary['elapsed'],
+        'fps': summary['fps'],
+        'frames_processed': summary['frames_processed'],
+        'final_settings': {
+            'num_sub_images_width': controller.num_sub_images_width if controller else settings['num_sub_images_width'],
+            'batch_size': controller.batch_size if controller else settings['batch_size'],
+            'num_workers': settings['num_workers'],
+        },
+        'adjustments': controller.history if controller else [],
+    }
+    return success, report
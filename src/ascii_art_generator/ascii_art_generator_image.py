@@ -2,87 +2,67 @@ import cv2
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+from functools import lru_cache
 from tqdm import tqdm
 
 from .utils_ascii import generate_ascii_images
 from .utils_compute_stats import compute_average_brightness
+from .utils_decode import load_tile_statistics, plan_image_decode
+from .utils_metrics import stage
+from .utils_tile_stats import TileStatistics, assemble_glyphs, get_tile_size, match_glyph_indices
 
 
 def generate_ascii_art(image_path, ascii_images_dir='ascii_images', num_sub_images_width=200, kernel_size=3, iterations=4,
-                       output_path='generated_ascii_art_image.png',plot_enabled =True, save_enabled=True, generate_ascii_images_flag=False):
+                       output_path='generated_ascii_art_image.png',plot_enabled =True, save_enabled=True, generate_ascii_images_flag=False,
+                       stats=None, decode_mode='auto'):
     """
     Generate ASCII art from a given image path.
-    
+
     Args:
         image_path (str): Path to the input image
         ascii_images_dir (str): Directory containing ASCII character images
         num_sub_images_width (int): Number of sub-images in width dimension (controls resolution)
         output_path (str): Path to save the generated ASCII art image
-        
+        stats (ConversionStats): Optional stats object recording the time spent per stage (default: None)
+        decode_mode (str): 'auto' decodes JPEGs with large enough sub-images directly at reduced resolution
+                           (see utils_decode.plan_image_decode). This is an intended change of the default output:
+                           a reduced decode changes the tile means slightly, so a small fraction of the characters
+                           can differ from 'full' (see utils_decode.MIN_REDUCED_TILE); without reduction both modes
+                           give the same result. 'full' always decodes the full color image, as earlier versions did
+                           (default: 'auto')
+
     Returns:
         numpy.ndarray: The generated ASCII art image
     """
     # Generate images for printable ASCII characters, if needed
     if generate_ascii_images_flag:
         generate_ascii_images()
+        clear_glyph_cache()
 
-    # Get brightness values for ASCII characters
-    average_brightness = compute_average_brightness(ascii_images_dir, kernel_size, iterations)
-    sorted_brightness = sorted(average_brightness.items(), key=lambda x: x[1])
+    assert decode_mode in ('auto', 'full'), "decode_mode must be 'auto' or 'full'"
 
     # Read and process input image
-    image = cv2.imread(image_path)
-    if image is None:
-        raise ValueError(f"Could not read image from path: {image_path}")
-    
-    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    height, width = gray_image.shape
-    
-    # Read in ASCII image and get their dimensions
-    ascii_aspect_ratio = get_aspect_ratio_of_ascii_image()
+    if decode_mode == 'auto':
+        with stage(stats, 'load_image'):
+            tile_statistics, image, scale = load_tile_statistics(image_path, num_sub_images_width, get_aspect_ratio_of_ascii_image())
+        # The plot shows the original color image, which a reduced decode does not provide
+        if plot_enabled and scale > 1:
+            image = cv2.imread(image_path)
+        ascii_art_image = ascii_art_from_tile_statistics(tile_statistics, ascii_images_dir, num_sub_images_width, kernel_size,
+                                                         iterations, stats)
+    else:
+        with stage(stats, 'load_image'):
+            image = cv2.imread(image_path)
+            if image is None:
+                raise ValueError(f"Could not read image from path: {image_path}")
+        ascii_art_image = ascii_art_from_array(image, ascii_images_dir, num_sub_images_width, kernel_size, iterations, stats)
 
-    # Calculate sub-image dimensions
-    size_sub_image_width = width // num_sub_images_width
-    size_sub_image_height = int(size_sub_image_width / ascii_aspect_ratio)
-    num_sub_images_height = int(np.ceil(height / size_sub_image_height))
-    num_sub_images_width_actual = int(np.ceil(width / size_sub_image_width)) # This might be 1 more than the original num_sub_images_width due to ceiling
-    
-    # Preload and pre-scale all ASCII images for better performance
-    ascii_images_cache = preload_ascii_images(ascii_images_dir, size_sub_image_width, size_sub_image_height, average_brightness)
-    
-    # Create empty ASCII art image with same dimensions as input image
-    ascii_art_image = np.zeros((height, width), dtype=np.uint8)
-
-    # Process each sub-image
-    for i in (range(num_sub_images_height)):
-        for j in range(num_sub_images_width_actual): 
-            # Calculate boundaries of the sub-image
-            start_y = i * size_sub_image_height
-            end_y = min((i + 1) * size_sub_image_height, height)
-            start_x = j * size_sub_image_width
-            end_x = min((j + 1) * size_sub_image_width, width)
-            
-            # Extract sub-image
-            sub_image = gray_image[start_y:end_y, start_x:end_x]
-            avg_brightness = np.mean(sub_image)
-            
-            # Find the ASCII character that best matches the brightness
-            closest_match = min(sorted_brightness, key=lambda x: abs(x[1] - avg_brightness))
-            
-            # Get the pre-loaded and pre-scaled ASCII image
-            ascii_image_resized = ascii_images_cache[closest_match[0]]
-            
-            # For partial areas/edges, crop the resized image to fit
-            actual_height = end_y - start_y
-            actual_width = end_x - start_x
-            ascii_image_cropped = ascii_image_resized[:actual_height, :actual_width]
-            
-            # Place the ASCII image into the final image
-            ascii_art_image[start_y:end_y, start_x:end_x] = ascii_image_cropped
-    
     # Save the generated ASCII art image
     if save_enabled:
-        cv2.imwrite(output_path, ascii_art_image)
+        with stage(stats, 'encode'):
+            cv2.imwrite(output_path, ascii_art_image)
+        if stats is not None and os.path.exists(output_path):
+            stats.add_bytes_written(os.path.getsize(output_path))
 
     # Plotting the original and ASCII art image
     if plot_enabled:
@@ -91,21 +71,168 @@ def generate_ascii_art(image_path, ascii_images_dir='ascii_images', num_sub_imag
         plt.imshow(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), cmap=None)
         plt.title('Original Image')
         plt.axis('off')
-        
+
         plt.subplot(1, 2, 2)
         plt.imshow(ascii_art_image, cmap='gray')
         plt.title('Generated ASCII Art')
         plt.axis('off')
         plt.tight_layout()
         plt.show()
-    
+
+    return ascii_art_image
+
+
+def ascii_art_from_array(image, ascii_images_dir='ascii_images', num_sub_images_width=200, kernel_size=3, iterations=4, stats=None):
+    """
+    Convert an image that is already in memory to ASCII art.
+    Brightness values and scaled ASCII images are cached, so repeated calls (e.g. for video frames) only pay for the conversion.
+
+    Args:
+        image (numpy.ndarray): Input image, either BGR (H, W, 3) or grayscale (H, W)
+        ascii_images_dir (str): Directory containing ASCII character images
+        num_sub_images_width (int): Number of sub-images in width dimension (controls resolution)
+        kernel_size (int): Size of the kernel for erosion used for the brightness computation
+        iterations (int): Number of iterations for erosion used for the brightness computation
+        stats (ConversionStats): Optional stats object recording the time spent per stage (default: None)
+
+    Returns:
+        numpy.ndarray: The generated ASCII art image (grayscale, same height and width as the input)
+    """
+    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+    # Integral image of the input, tile means for any resolution are read off it in O(1) per tile
+    with stage(stats, 'tile_stats'):
+        tile_statistics = TileStatistics(gray_image)
+
+    return ascii_art_from_tile_statistics(tile_statistics, ascii_images_dir, num_sub_images_width, kernel_size, iterations, stats)
+
+
+def ascii_art_from_tile_statistics(tile_statistics, ascii_images_dir='ascii_images', num_sub_images_width=200, kernel_size=3, iterations=4,
+                                   stats=None):
+    """
+    Render ASCII art from precomputed tile statistics.
+    The same TileStatistics object can be rendered at any number of resolutions without reprocessing the image.
+
+    Args:
+        tile_statistics (TileStatistics): Integral image of the grayscale input
+        ascii_images_dir (str): Directory containing ASCII character images
+        num_sub_images_width (int): Number of sub-images in width dimension (controls resolution)
+        kernel_size (int): Size of the kernel for erosion used for the brightness computation
+        iterations (int): Number of iterations for erosion used for the brightness computation
+        stats (ConversionStats): Optional stats object recording the time spent per stage (default: None)
+
+    Returns:
+        numpy.ndarray: The generated ASCII art image (grayscale, same height and width as the input)
+    """
+    glyph_indices, (size_sub_image_width, size_sub_image_height) = match_tiles(
+        tile_statistics, ascii_images_dir, num_sub_images_width, kernel_size, iterations, stats)
+
+    # Load the ASCII images sorted by brightness and pre-scaled to the sub-image size
+    with stage(stats, 'load_glyphs'):
+        _, _, glyph_stack = load_glyph_atlas(ascii_images_dir, size_sub_image_width, size_sub_image_height, kernel_size, iterations)
+
+    # Place the matched ASCII images, partial areas at the edges are cropped
+    with stage(stats, 'assemble'):
+        ascii_art_image = assemble_glyphs(glyph_indices, glyph_stack, tile_statistics.height, tile_statistics.width)
+
     return ascii_art_image
 
 
+def match_tiles(tile_statistics, ascii_images_dir='ascii_images', num_sub_images_width=200, kernel_size=3, iterations=4, stats=None):
+    """
+    Find the best matching ASCII character for every sub-image without rendering the result.
+
+    Args:
+        tile_statistics (TileStatistics): Integral image of the grayscale input
+        ascii_images_dir (str): Directory containing ASCII character images
+        num_sub_images_width (int): Number of sub-images in width dimension (controls resolution)
+        kernel_size (int): Size of the kernel for erosion used for the brightness computation
+        iterations (int): Number of iterations for erosion used for the brightness computation
+        stats (ConversionStats): Optional stats object recording the time spent per stage (default: None)
+
+    Returns:
+        tuple: (glyph indices of shape (num_sub_images_height, num_sub_images_width) into the brightness-sorted
+               glyph list of load_glyph_atlas, (size_sub_image_width, size_sub_image_height))
+    """
+    # Calculate sub-image dimensions
+    size_sub_image_width, size_sub_image_height = get_tile_size(tile_statistics.width, num_sub_images_width,
+                                                                get_aspect_ratio_of_ascii_image())
+
+    with stage(stats, 'load_glyphs'):
+        _, sorted_brightness = load_glyph_brightness(ascii_images_dir, kernel_size, iterations)
+        brightness_values = [brightness for _, brightness in sorted_brightness]
+
+    # Find the ASCII character that best matches the brightness of each sub-image
+    with stage(stats, 'match'):
+        tile_means = tile_statistics.tile_means(size_sub_image_width, size_sub_image_height)
+        glyph_indices = match_glyph_indices(tile_means, brightness_values)
+
+    return glyph_indices, (size_sub_image_width, size_sub_image_height)
+
+
+def generate_ascii_art_progressive(image_path, ascii_images_dir='ascii_images', num_sub_images_width=200, kernel_size=3, iterations=4,
+                                   preview_widths=None, stats=None, decode_mode='auto'):
+    """
+    Generate ASCII art coarse-to-fine: quick low-resolution previews first, then the requested resolution.
+    The coarsest preview comes from a cheap decode planned for its large sub-images (for JPEGs at up to 1/8
+    resolution, see utils_decode.load_tile_statistics). The image is then read once more at the resolution the
+    final result needs and summarized into an integral image, from which every further step only costs the tile
+    lookup and the assembly. If both decodes would be the same, the first one is reused.
+
+    Args:
+        image_path (str): Path to the input image
+        ascii_images_dir (str): Directory containing ASCII character images
+        num_sub_images_width (int): Number of sub-images in width dimension of the final result
+        kernel_size (int): Size of the kernel for erosion used for the brightness computation
+        iterations (int): Number of iterations for erosion used for the brightness computation
+        preview_widths (list): Numbers of sub-images in width dimension of the previews
+                               (default: a quarter and half of num_sub_images_width)
+        stats (ConversionStats): Optional stats object recording the time spent per stage (default: None)
+        decode_mode (str): 'auto' or 'full', see generate_ascii_art; only applies to the final result and the
+                           previews after the first one (default: 'auto')
+
+    Yields:
+        tuple: (num_sub_images_width, ASCII art image) for every preview and finally the requested resolution
+    """
+    assert decode_mode in ('auto', 'full'), "decode_mode must be 'auto' or 'full'"
+    ascii_aspect_ratio = get_aspect_ratio_of_ascii_image()
+    if preview_widths is None:
+        preview_widths = [num_sub_images_width // 4, num_sub_images_width // 2]
+    preview_widths = sorted(set(w for w in preview_widths if 0 < w < num_sub_images_width))
+
+    preview_scale = None
+    if preview_widths:
+        with stage(stats, 'load_preview'):
+            preview_statistics, _, preview_scale = load_tile_statistics(image_path, preview_widths[0], ascii_aspect_ratio)
+        yield preview_widths[0], ascii_art_from_tile_statistics(preview_statistics, ascii_images_dir, preview_widths[0],
+                                                                kernel_size, iterations, stats)
+        preview_widths = preview_widths[1:]
+
+    # The finest requested resolution decides how far the final decode may be reduced
+    final_scale = plan_image_decode(image_path, num_sub_images_width, ascii_aspect_ratio)[0] if decode_mode == 'auto' else 1
+    if final_scale == preview_scale:
+        tile_statistics = preview_statistics
+    elif decode_mode == 'auto':
+        with stage(stats, 'load_image'):
+            tile_statistics, _, _ = load_tile_statistics(image_path, num_sub_images_width, ascii_aspect_ratio)
+    else:
+        with stage(stats, 'load_image'):
+            image = cv2.imread(image_path)
+            if image is None:
+                raise ValueError(f"Could not read image from path: {image_path}")
+            gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        with stage(stats, 'tile_stats'):
+            tile_statistics = TileStatistics(gray_image)
+
+    for current_width in preview_widths + [num_sub_images_width]:
+        yield current_width, ascii_art_from_tile_statistics(tile_statistics, ascii_images_dir, current_width, kernel_size, iterations, stats)
+
+
+@lru_cache(maxsize=None)
 def get_aspect_ratio_of_ascii_image():
     """ Compute the aspect ratio of ASCII character images by dividing width by height. """
     # Read in ASCII image and get their dimensions
-    import os
     current_dir = os.path.dirname(__file__)
     path_to_ascii = os.path.join(current_dir, 'ascii_images')
     ascii_image_sample = cv2.imread(os.path.join(path_to_ascii, os.listdir(path_to_ascii)[1]), cv2.IMREAD_GRAYSCALE)
@@ -133,6 +260,61 @@ def preload_ascii_images(ascii_images_dir, size_sub_image_width, size_sub_image_
         ascii_images_cache[filename] = ascii_image_resized
     return ascii_images_cache
 
+@lru_cache(maxsize=8)
+def load_glyph_brightness(ascii_images_dir, kernel_size=3, iterations=4):
+    """ Cached computation of the average brightness of all ASCII character images.
+    Args:
+        ascii_images_dir (str): Directory containing ASCII character images
+        kernel_size (int): Size of the kernel for erosion
+        iterations (int): Number of iterations for erosion
+    Returns:
+        tuple: (dict mapping filenames to average brightness, list of (filename, brightness) sorted by brightness)
+    """
+    average_brightness = compute_average_brightness(ascii_images_dir, kernel_size, iterations)
+    sorted_brightness = sorted(average_brightness.items(), key=lambda x: x[1])
+    return average_brightness, sorted_brightness
+
+@lru_cache(maxsize=64)
+def load_scaled_ascii_images(ascii_images_dir, size_sub_image_width, size_sub_image_height, kernel_size=3, iterations=4):
+    """ Cached version of preload_ascii_images, keyed by directory, target size and erosion settings.
+    Args:
+        ascii_images_dir (str): Directory containing ASCII character images
+        size_sub_image_width (int): Width to resize ASCII images to
+        size_sub_image_height (int): Height to resize ASCII images to
+        kernel_size (int): Size of the kernel for erosion used for the brightness computation
+        iterations (int): Number of iterations for erosion used for the brightness computation
+    Returns:
+        dict: Dictionary mapping filenames to pre-scaled ASCII images
+    """
+    average_brightness, _ = load_glyph_brightness(ascii_images_dir, kernel_size, iterations)
+    return preload_ascii_images(ascii_images_dir, size_sub_image_width, size_sub_image_height, average_brightness)
+
+@lru_cache(maxsize=64)
+def load_glyph_atlas(ascii_images_dir, size_sub_image_width, size_sub_image_height, kernel_size=3, iterations=4):
+    """ Cached array form of the scaled ASCII images, ordered by brightness, for vectorized matching and assembly.
+    Args:
+        ascii_images_dir (str): Directory containing ASCII character images
+        size_sub_image_width (int): Width to resize ASCII images to
+        size_sub_image_height (int): Height to resize ASCII images to
+        kernel_size (int): Size of the kernel for erosion used for the brightness computation
+        iterations (int): Number of iterations for erosion used for the brightness computation
+    Returns:
+        tuple: (list of filenames, numpy.ndarray of brightness values, numpy.ndarray of scaled images (num_glyphs, height, width)),
+               all sorted by ascending brightness
+    """
+    _, sorted_brightness = load_glyph_brightness(ascii_images_dir, kernel_size, iterations)
+    ascii_images_cache = load_scaled_ascii_images(ascii_images_dir, size_sub_image_width, size_sub_image_height, kernel_size, iterations)
+    filenames = [filename for filename, _ in sorted_brightness]
+    brightness_values = np.array([brightness for _, brightness in sorted_brightness], dtype=np.float64)
+    glyph_stack = np.stack([ascii_images_cache[filename] for filename in filenames])
+    return filenames, brightness_values, glyph_stack
+
+def clear_glyph_cache():
+    """ Drop all cached brightness values and scaled ASCII images, e.g. after regenerating the character images. """
+    load_glyph_brightness.cache_clear()
+    load_scaled_ascii_images.cache_clear()
+    load_glyph_atlas.cache_clear()
+
 if __name__ == "__main__":
     # Apply ASCII art generation for some sample images stored in './example_images' directory
     for image_path in os.listdir('./example_images'):
@@ -145,4 +327,4 @@ if __name__ == "__main__":
                 output_path=f'./output/generated_ascii_art_{os.path.splitext(image_path)[0]}.png',
                 plot_enabled=False,
                 save_enabled=True
-            )
\ No newline at end of file
+            )
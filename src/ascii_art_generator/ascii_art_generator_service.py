@@ -0,0 +1,383 @@
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+from .ascii_art_generator_image import ascii_art_from_array, load_glyph_brightness
+from .ascii_art_generator_video import convert_video_to_ascii, validate_video_job
+from .utils_metrics import ConversionStats, stage
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceBusy(Exception):
+    """ Raised when a job is submitted while all workers are busy and the queue is full. """
+
+
+class ConversionService:
+    """
+    Long-running conversion service that keeps the glyph set warm and limits concurrent jobs.
+
+    The brightness values and scaled ASCII images are cached process-wide (see ``load_glyph_brightness``
+    and ``load_scaled_ascii_images``), so every job after the first only pays for the actual conversion.
+
+    Args:
+        ascii_images_dir (str): Default directory containing ASCII character images (default: package ascii_images)
+        max_workers (int): Maximum number of jobs converting at the same time (default: 2)
+        max_queue (int): Maximum number of jobs waiting for a worker, further jobs are rejected (default: 8)
+        kernel_size (int): Default erosion kernel size for the brightness computation (default: 3)
+        iterations (int): Default number of erosion iterations for the brightness computation (default: 4)
+    """
+
+    def __init__(self, ascii_images_dir=None, max_workers=2, max_queue=8, kernel_size=3, iterations=4):
+        if ascii_images_dir is None:
+            current_dir = os.path.dirname(__file__)
+            ascii_images_dir = os.path.join(current_dir, 'ascii_images')
+        assert max_workers > 0, "max_workers must be greater than 0"
+        assert max_queue >= 0, "max_queue must be non-negative"
+        self.ascii_images_dir = ascii_images_dir
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.kernel_size = kernel_size
+        self.iterations = iterations
+        self._slots = threading.Semaphore(max_workers)
+        self._lock = threading.Lock()
+        self.active_jobs = 0
+        self.queued_jobs = 0
+
+    def warm_up(self):
+        """ Load the brightness values of the default glyph set so the first job does not pay for it. """
+        load_glyph_brightness(self.ascii_images_dir, self.kernel_size, self.iterations)
+
+    @contextmanager
+    def job_slot(self, stats=None):
+        """
+        Wait for a free worker slot, raising ServiceBusy if the queue is already full.
+        Args:
+            stats (ConversionStats): Optional stats object, the queue depth at admission and the wait time are recorded
+        """
+        with self._lock:
+            if self.active_jobs + self.queued_jobs >= self.max_workers + self.max_queue:
+                raise ServiceBusy(f"{self.active_jobs} jobs running and {self.queued_jobs} queued")
+            self.queued_jobs += 1
+            if stats is not None:
+                stats.record_queue_depth('jobs', self.queued_jobs)
+        try:
+            with stage(stats, 'queue_wait'):
+                self._slots.acquire()
+        finally:
+            with self._lock:
+                self.queued_jobs -= 1
+        with self._lock:
+            self.active_jobs += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active_jobs -= 1
+            self._slots.release()
+
+    def status(self):
+        """ Return the current load of the service as a dictionary. """
+        with self._lock:
+            return {'active_jobs': self.active_jobs, 'queued_jobs': self.queued_jobs,
+                    'max_workers': self.max_workers, 'max_queue': self.max_queue}
+
+    def convert_image(self, image, num_sub_images_width=200, ascii_images_dir=None, kernel_size=None, iterations=None, stats=None):
+        """
+        Convert an in-memory image to ASCII art in a worker slot.
+        Args:
+            image (numpy.ndarray): Input image (BGR or grayscale)
+            num_sub_images_width (int): Number of sub-images in width dimension (controls resolution)
+            ascii_images_dir (str): Directory containing ASCII character images (default: service default)
+            kernel_size (int): Erosion kernel size (default: service default)
+            iterations (int): Erosion iterations (default: service default)
+            stats (ConversionStats): Optional stats object
+        Returns:
+            numpy.ndarray: The generated ASCII art image
+        """
+        with self.job_slot(stats):
+            return ascii_art_from_array(
+                image,
+                ascii_images_dir or self.ascii_images_dir,
+                num_sub_images_width,
+                self.kernel_size if kernel_size is None else kernel_size,
+                self.iterations if iterations is None else iterations,
+                stats
+            )
+
+    def convert_video(self, input_video_path, output_video_path, stats=None, **kwargs):
+        """
+        Convert a video to ASCII art in a worker slot, see ``convert_video_to_ascii`` for the keyword arguments.
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        kwargs.setdefault('ascii_images_dir', self.ascii_images_dir)
+        with self.job_slot(stats):
+            return convert_video_to_ascii(input_video_path, output_video_path, stats=stats,
+                                          show_progress=False, verbose=False, **kwargs)
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'false', '1', '0'):
+        return value.lower() in ('true', '1')
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise ValueError(f"Expected a boolean, got {value!r}")
+
+
+# Options of convert_video_to_ascii that may be passed in a video job, with the function converting their values
+VIDEO_JOB_OPTIONS = {
+    'start_time': float,
+    'end_time': float,
+    'num_sub_images_width': int,
+    'speed_multiplier': float,
+    'ascii_images_dir': str,
+    'compress_output': _parse_bool,
+    'compression_level': str,
+    'batch_size': int,
+    'num_workers': int,
+}
+
+
+def parse_video_job_options(job):
+    """
+    Pick the options of convert_video_to_ascii from a video job and convert them to their expected types.
+    Args:
+        job (dict): Decoded JSON job
+    Returns:
+        dict: Keyword arguments for convert_video_to_ascii
+    Raises:
+        ValueError: If an option has a value of the wrong type
+    """
+    options = {}
+    for key, convert in VIDEO_JOB_OPTIONS.items():
+        if key not in job or (key == 'end_time' and job[key] is None):
+            continue
+        value = job[key]
+        # bool is a subclass of int and int(3.5) would silently truncate, so the JSON types are checked first
+        accepted_types = {str: (str,), int: (int, str), float: (int, float, str)}.get(convert, (object,))
+        if isinstance(value, bool) and convert is not _parse_bool or not isinstance(value, accepted_types):
+            raise ValueError(f"Invalid value for '{key}': {value!r}")
+        try:
+            options[key] = convert(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for '{key}': {value!r}")
+    return options
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler of the conversion service.
+
+    Endpoints:
+        GET  /health  Service load as JSON
+        POST /image   Either raw image bytes (options as query parameters) answered with a PNG,
+                      or a JSON job ``{"image_path": ..., "output_path": ..., "num_sub_images_width": ...}`` answered with JSON
+        POST /video   JSON job ``{"input_video_path": ..., "output_video_path": ..., ...}`` answered with
+                      newline-delimited JSON progress messages followed by a final result message
+    """
+
+    protocol_version = 'HTTP/1.0'
+    # Minimum seconds between two streamed progress messages of a video job
+    progress_interval = 0.5
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return 'unix-socket'
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/health':
+            self._send_json(200, dict(status='ok', **self.service.status()))
+        else:
+            self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        endpoint = urlparse(self.path).path
+        try:
+            if endpoint == '/image':
+                self._handle_image()
+            elif endpoint == '/video':
+                self._handle_video()
+            else:
+                self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+        except ServiceBusy as e:
+            self._send_json(503, {'error': f"Service busy: {e}"})
+        except (ValueError, KeyError, AssertionError) as e:
+            self._send_json(400, {'error': str(e) or repr(e)})
+        except Exception as e:
+            logger.exception("Unhandled error in %s", endpoint)
+            self._send_json(500, {'error': f"Internal error: {e!r}"})
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length) if length > 0 else b''
+
+    def _read_json(self):
+        try:
+            return json.loads(self._read_body() or b'{}')
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON body: {e}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle_image(self):
+        stats = ConversionStats()
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            job = self._read_json()
+            image = cv2.imread(job['image_path'])
+            if image is None:
+                raise ValueError(f"Could not read image from path: {job['image_path']}")
+            options = job
+        else:
+            data = np.frombuffer(self._read_body(), dtype=np.uint8)
+            image = cv2.imdecode(data, cv2.IMREAD_COLOR) if data.size else None
+            if image is None:
+                raise ValueError("Request body is not a decodable image")
+            options = {key: values[-1] for key, values in parse_qs(urlparse(self.path).query).items()}
+
+        ascii_images_dir = options.get('ascii_images_dir')
+        if ascii_images_dir is not None and not os.path.isdir(ascii_images_dir):
+            raise ValueError(f"ASCII images directory does not exist: {ascii_images_dir}")
+        ascii_art = self.service.convert_image(
+            image,
+            num_sub_images_width=int(options.get('num_sub_images_width', 200)),
+            ascii_images_dir=ascii_images_dir,
+            kernel_size=int(options['kernel_size']) if 'kernel_size' in options else None,
+            iterations=int(options['iterations']) if 'iterations' in options else None,
+            stats=stats
+        )
+
+        output_path = options.get('output_path')
+        if output_path:
+            with stage(stats, 'encode'):
+                written = cv2.imwrite(output_path, ascii_art)
+            if not written:
+                raise ValueError(f"Could not write image to path: {output_path}")
+            stats.add_bytes_written(os.path.getsize(output_path))
+            self._send_json(200, {'output_path': output_path, 'shape': list(ascii_art.shape), 'stats': stats.summary()})
+            return
+
+        with stage(stats, 'encode'):
+            _, encoded = cv2.imencode('.png', ascii_art)
+        body = encoded.tobytes()
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle_video(self):
+        job = self._read_json()
+        input_video_path = job['input_video_path']
+        output_video_path = job['output_video_path']
+        options = parse_video_job_options(job)
+        options.setdefault('ascii_images_dir', self.service.ascii_images_dir)
+        # Invalid jobs are answered with 400 here, once the stream started only a failure line can be sent
+        validate_video_job(input_video_path, output_video_path, **options)
+
+        last_sent = [0.0]
+
+        def send_progress(stats):
+            now = time.perf_counter()
+            if now - last_sent[0] >= self.progress_interval:
+                last_sent[0] = now
+                self._write_line(stats.progress())
+
+        stats = ConversionStats(callback=send_progress)
+        # Admission is checked before the streaming response starts, so a full queue still answers with 503
+        with self.service.job_slot(stats):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers()
+            try:
+                success = convert_video_to_ascii(input_video_path, output_video_path, stats=stats,
+                                                 show_progress=False, verbose=False, **options)
+            except Exception as e:
+                # The response has already started, so errors are reported in the stream
+                if not isinstance(e, AssertionError):
+                    logger.exception("Unhandled error in video job")
+                self._write_line({'success': False, 'error': str(e) or repr(e)})
+                return
+        self._write_line({'success': success, 'output_video_path': output_video_path, 'stats': stats.summary()})
+
+    def _write_line(self, payload):
+        self.wfile.write(json.dumps(payload).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ HTTP server listening on a Unix domain socket, handling each connection in its own thread. """
+    daemon_threads = True
+
+
+def create_server(service, host='127.0.0.1', port=8765, unix_socket=None):
+    """
+    Create an HTTP server for the conversion service.
+    Args:
+        service (ConversionService): Service handling the conversion jobs
+        host (str): Host to bind to when listening on TCP (default: '127.0.0.1')
+        port (int): Port to bind to when listening on TCP (default: 8765)
+        unix_socket (str): Path of a Unix domain socket to listen on instead of TCP (default: None)
+    Returns:
+        socketserver.BaseServer: The server, call ``serve_forever()`` to start it
+    """
+    if unix_socket is not None:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, ConversionRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), ConversionRequestHandler)
+    server.service = service
+    return server
+
+
+def serve(host='127.0.0.1', port=8765, unix_socket=None, ascii_images_dir=None, max_workers=2, max_queue=8):
+    """
+    Run the conversion service until interrupted.
+    Args:
+        host (str): Host to bind to when listening on TCP (default: '127.0.0.1')
+        port (int): Port to bind to when listening on TCP (default: 8765)
+        unix_socket (str): Path of a Unix domain socket to listen on instead of TCP (default: None)
+        ascii_images_dir (str): Default directory containing ASCII character images (default: package ascii_images)
+        max_workers (int): Maximum number of jobs converting at the same time (default: 2)
+        max_queue (int): Maximum number of jobs waiting for a worker (default: 8)
+    """
+    service = ConversionService(ascii_images_dir, max_workers=max_workers, max_queue=max_queue)
+    service.warm_up()
+    server = create_server(service, host, port, unix_socket)
+    address = unix_socket if unix_socket is not None else f"http://{host}:{server.server_address[1]}"
+    print(f"Serving ASCII art conversions on {address} ({max_workers} workers, queue of {max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if unix_socket is not None and os.path.exists(unix_socket):
+            os.remove(unix_socket)
@@ -1,75 +1,57 @@
 import cv2
 import numpy as np
 import os
-import tempfile
-import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
-from .ascii_art_generator_image import generate_ascii_art
-from .utils_compression import compress_video
+from .ascii_art_generator_image import (get_aspect_ratio_of_ascii_image, load_glyph_atlas, load_glyph_brightness,
+                                        match_tiles)
+from .utils_compression import compress_video_in_place
+from .utils_glyph_video import GLYPH_VIDEO_EXTENSION, GlyphVideoWriter, make_glyph_renderer
+from .utils_metrics import stage
+from .utils_tile_stats import TileStatistics, assemble_glyphs, batch_tile_means, get_tile_size, match_glyph_indices
 
 
-def convert_frame_to_ascii(frame, temp_frame_path, temp_ascii_path, num_sub_images_width=100, ascii_images_dir=None):
+def validate_video_job(input_video_path, output_video_path, start_time=0.0, end_time=None, num_sub_images_width=100,
+                       speed_multiplier=1.0, ascii_images_dir=None, batch_size=1, num_workers=1, **options):
     """
-    Convert a single video frame to ASCII art using the existing generate_ascii_art function.
-    
-    Args:
-        frame: Input video frame (BGR)
-        temp_frame_path: Path to save temporary frame
-        temp_ascii_path: Path to save temporary ASCII result
-        num_sub_images_width: Number of sub-images in x dimension (controls resolution)
-        ascii_images_dir: Directory containing ASCII character images
-        
+    Check the arguments of a convert_video_to_ascii call before any work is done.
+    The arguments are the same as for convert_video_to_ascii; options not listed here are accepted but not checked,
+    so a complete set of job options can be passed as keyword arguments.
     Returns:
-        ASCII art frame as grayscale image
+        str: The ASCII images directory to use, the package ascii_images if ascii_images_dir is None
+    Raises:
+        AssertionError: If any argument is invalid
     """
     # Set default ascii_images_dir if not provided
     if ascii_images_dir is None:
         current_dir = os.path.dirname(__file__)
         ascii_images_dir = os.path.join(current_dir, 'ascii_images')
     
-    # Save frame temporarily with error checking
-    success = cv2.imwrite(temp_frame_path, frame)
-    if not success:
-        raise ValueError(f"Failed to save temporary frame: {temp_frame_path}")
-    
-    # Verify the file was actually created and is readable
-    if not os.path.exists(temp_frame_path):
-        raise ValueError(f"Temporary frame file was not created: {temp_frame_path}")
-    
-    try:
-        # Test if we can read the file immediately
-        test_image = cv2.imread(temp_frame_path)
-        if test_image is None:
-            raise ValueError(f"Cannot read temporary frame file: {temp_frame_path}")
-        
-        # Generate ASCII art using existing function
-        ascii_art = generate_ascii_art(
-            image_path=temp_frame_path,
-            ascii_images_dir=ascii_images_dir,
-            num_sub_images_width=num_sub_images_width,
-            output_path=temp_ascii_path,
-            plot_enabled=False,
-            save_enabled=False,
-            generate_ascii_images_flag=False
-        )
-        cv2.imwrite(temp_ascii_path, ascii_art)
-        return ascii_art
-    
-    except Exception as e:
-        # Clean up temp file in case of error
-        if os.path.exists(temp_frame_path):
-            os.remove(temp_frame_path)
-        raise e
+    assert speed_multiplier >= 1.0, "Speed multiplier must be greater than 1.0. Slowing down videos is not supported."
+    assert num_sub_images_width > 0, "num_sub_images_width must be greater than 0"
+    assert batch_size > 0, "batch_size must be greater than 0"
+    assert num_workers > 0, "num_workers must be greater than 0"
+    assert os.path.exists(input_video_path), f"Input video file does not exist: {input_video_path}"
+    assert os.path.exists(ascii_images_dir), f"ASCII images directory does not exist: {ascii_images_dir}"
+    assert input_video_path.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')), "Unsupported video format. Supported formats: .mp4, .avi, .mov, .mkv"
+    assert output_video_path.lower().endswith(('.mp4', '.avi', GLYPH_VIDEO_EXTENSION)), "Output video format must be .mp4, .avi or .agv"
+    assert start_time >= 0, "Start time must be non-negative"
+    assert end_time is None or end_time > start_time, "End time must be greater than start time"
+    return ascii_images_dir
+
 
 def convert_video_to_ascii(input_video_path, output_video_path, start_time=0.0, end_time=None, 
                           num_sub_images_width=100, speed_multiplier=1.0, ascii_images_dir=None,
-                          compress_output=True, compression_level='medium'):
+                          compress_output=True, compression_level='medium', stats=None, show_progress=True, verbose=True,
+                          cancel_event=None, batch_size=1, num_workers=1, controller=None):
     """
     Convert a video to ASCII art video.
     Args:
         input_video_path (str): Path to the input video file
-        output_video_path (str): Path where the ASCII video will be saved
+        output_video_path (str): Path where the ASCII video will be saved. With the '.agv' extension a compact
+                                 glyph-index video is written instead, see render_glyph_video and glyph_video_to_text
         start_time (float): Start time in seconds (default: 0.0)
         end_time (float): End time in seconds (default: None - full video)
         num_sub_images_width (int): ASCII resolution - lower = more pixelated, higher = more detailed (default: 100)
@@ -77,29 +59,36 @@ def convert_video_to_ascii(input_video_path, output_video_path, start_time=0.0,
         ascii_images_dir (str): Directory containing ASCII character images (default: package ascii_images)
         compress_output (bool): Whether to compress the output video to reduce file size (default: True)
         compression_level (str): Compression level - 'low', 'medium', 'high' (default: 'medium')
+        stats (ConversionStats): Optional stats object recording per-stage timings and frame/byte counters (default: None)
+        show_progress (bool): Whether to show a tqdm progress bar (default: True)
+        verbose (bool): Whether to print status and compression messages (default: True)
+        cancel_event (threading.Event): Optional event, once set the conversion stops after the current frame,
+                                        releases the video capture and writer and returns False (default: None)
+        batch_size (int): Number of decoded frames converted together as one (N, H, W) array. Larger batches
+                          amortize the per-frame overhead, mostly noticeable for small num_sub_images_width (default: 1)
+        num_workers (int): Number of threads converting batches while the next frames are decoded; results are
+                           still written in order (default: 1 - convert on the decoding thread)
+        controller (ThroughputController): Optional controller adapting num_sub_images_width and batch_size during the
+                                           run to reach its target fps, see ascii_art_generator_autotune (default: None)
     Returns:
         bool: True if successful, False otherwise
     """
     
-    # Set default ascii_images_dir if not provided
-    if ascii_images_dir is None:
-        current_dir = os.path.dirname(__file__)
-        ascii_images_dir = os.path.join(current_dir, 'ascii_images')
-    
-    assert speed_multiplier >= 1.0, "Speed multiplier must be greater than 1.0. Slowing down videos is not supported."
-    assert num_sub_images_width > 0, "num_sub_images_width must be greater than 0"
-    assert os.path.exists(input_video_path), f"Input video file does not exist: {input_video_path}"
-    assert os.path.exists(ascii_images_dir), f"ASCII images directory does not exist: {ascii_images_dir}"
-    assert input_video_path.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')), "Unsupported video format. Supported formats: .mp4, .avi, .mov, .mkv"
-    assert output_video_path.lower().endswith(('.mp4', '.avi')), "Output video format must be .mp4 or .avi"
-    assert start_time >= 0, "Start time must be non-negative"
-    assert end_time is None or end_time > start_time, "End time must be greater than start time"
+    ascii_images_dir = validate_video_job(input_video_path, output_video_path, start_time=start_time, end_time=end_time,
+                                          num_sub_images_width=num_sub_images_width, speed_multiplier=speed_multiplier,
+                                          ascii_images_dir=ascii_images_dir, batch_size=batch_size,
+                                          num_workers=num_workers)
+    # Glyph-index videos only store the index grid of every frame, rendering happens on replay
+    glyph_output = output_video_path.lower().endswith(GLYPH_VIDEO_EXTENSION)
+    # The grid of a glyph-index video is fixed, only the batch size may change there
+    assert controller is None or not (glyph_output and controller.adapt_width), "Glyph-index output needs a controller with adapt_width=False"
     # Open the video file
     cap = cv2.VideoCapture(input_video_path)
     
     # Check if the video was opened successfully
     if not cap.isOpened():
-        print(f"Error: Could not open video file: {input_video_path}")
+        if verbose:
+            print(f"Error: Could not open video file: {input_video_path}")
         return False
         
     # Get video properties
@@ -112,11 +101,6 @@ def convert_video_to_ascii(input_video_path, output_video_path, start_time=0.0,
     if end_time is None:
         end_time = total_frames / fps
     
-    # Create unique temporary file paths for frame processing to avoid conflicts
-    timestamp = int(time.time() * 1000000)  # microsecond timestamp
-    temp_frame_path = f"temp_frame_{timestamp}.png"
-    temp_ascii_path = f"temp_ascii_{timestamp}.png"
-    
     # Calculate start and end frame numbers
     start_frame = int(start_time * fps)
     end_frame = min(int(end_time * fps), total_frames - 1)
@@ -124,21 +108,43 @@ def convert_video_to_ascii(input_video_path, output_video_path, start_time=0.0,
     # Set the video to start at the start_frame
     cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
     
-    # Define the codec and create VideoWriter object
-    # For ASCII art, we'll use grayscale output
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height), isColor=False)
-    
     frame_count = start_frame
     frames_written = 0
     
+    if controller is not None:
+        num_sub_images_width, batch_size = controller.num_sub_images_width, controller.batch_size
+    
+    # Grayscale frames are gathered here and converted together once the batch is full
+    frame_batch = np.empty((batch_size, height, width), dtype=np.uint8)
+    batch_fill = 0
+    
     # Process each frame with progress bar
-    progress_bar = tqdm(total=end_frame-start_frame, desc="Converting frames", unit="frames")
+    progress_bar = tqdm(total=end_frame-start_frame, desc="Converting frames", unit="frames", disable=not show_progress)
     
+    out = None
+    pipeline = None
     success = False
+    cancelled = False
     try:
+        # Created inside the try block so the capture is released if e.g. the width does not fit the frame
+        if glyph_output:
+            out = open_glyph_video_writer(output_video_path, fps, (width, height), num_sub_images_width, ascii_images_dir)
+        else:
+            # Define the codec and create VideoWriter object
+            # For ASCII art, we'll use grayscale output
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            out = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height), isColor=False)
+        pipeline = FrameBatchPipeline(out, ascii_images_dir, glyph_output, num_workers, stats)
+        if controller is not None:
+            controller.start()
+        
         while frame_count <= end_frame:
-            ret, frame = cap.read()
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                break
+            
+            with stage(stats, 'decode'):
+                ret, frame = cap.read()
             
             if not ret:
                 break
@@ -148,74 +154,360 @@ def convert_video_to_ascii(input_video_path, output_video_path, start_time=0.0,
             if (frame_count - start_frame) % int(speed_multiplier) != 0:
                 frame_count += 1
                 progress_bar.update(1)
+                if stats is not None:
+                    stats.frame_skipped()
                 continue
             
-            # Convert frame to ASCII art
-            ascii_frame = convert_frame_to_ascii(
-                frame, 
-                temp_frame_path,
-                temp_ascii_path,
-                num_sub_images_width,
-                ascii_images_dir
-            )
-
-            # Write the ASCII frame to output video
-            out.write(ascii_frame)
-            frames_written += 1
+            with stage(stats, 'decode'):
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=frame_batch[batch_fill])
+            batch_fill += 1
+            if stats is not None:
+                stats.record_queue_depth('batch', batch_fill)
+            
+            # Convert the full batch in one go and write the frames in order
+            if batch_fill == batch_size:
+                pipeline.submit(frame_batch, num_sub_images_width)
+                if controller is not None:
+                    num_sub_images_width, batch_size = controller.update(batch_fill)
+                frame_batch = np.empty((batch_size, height, width), dtype=np.uint8)
+                batch_fill = 0
             
             frame_count += 1
             progress_bar.update(1)
         
+        # Convert the last, partially filled batch
+        if batch_fill > 0 and not cancelled:
+            pipeline.submit(frame_batch[:batch_fill], num_sub_images_width)
+        if not cancelled:
+            pipeline.flush()
+        frames_written = pipeline.frames_written
+        
         progress_bar.close()
-        success = True
+        success = not cancelled
+        if cancelled and verbose:
+            print("Video conversion cancelled")
         
     except Exception as e:
-        print(f"Error during video processing: {e}")
+        if verbose:
+            print(f"Error during video processing: {e}")
         success = False
         
     finally:
         # Release resources
+        if pipeline is not None:
+            pipeline.close()
         cap.release()
-        out.release()
-        
-        # Clean up temporary files
-        if os.path.exists(temp_frame_path):
-            os.remove(temp_frame_path)
-        if os.path.exists(temp_ascii_path):
-            os.remove(temp_ascii_path)
+        if out is not None:
+            out.release()
     
     # Compress the output video if requested (after resources are released)
-    if success and compress_output and os.path.exists(output_video_path):
-        try:
-            # Get original file size before compression
-            original_size = os.path.getsize(output_video_path)
+    if success and compress_output and not glyph_output and os.path.exists(output_video_path):
+        compress_video_in_place(output_video_path, compression_level, stats, show_progress, verbose)
+    
+    if success and stats is not None and os.path.exists(output_video_path):
+        stats.add_bytes_written(os.path.getsize(output_video_path))
+    
+    return success
+
+def convert_frame_batch(gray_frames, ascii_images_dir, num_sub_images_width=100, render=True, kernel_size=3, iterations=4, stats=None):
+    """
+    Convert a batch of grayscale frames to ASCII art; tile means, glyph lookup and assembly each run once for the whole batch.
+    Args:
+        gray_frames (numpy.ndarray): Grayscale frames of shape (N, H, W)
+        ascii_images_dir (str): Directory containing ASCII character images
+        num_sub_images_width (int): Number of sub-images in width dimension (controls resolution)
+        render (bool): Whether to assemble the ASCII images or only return the glyph indices (default: True)
+        kernel_size (int): Size of the kernel for erosion used for the brightness computation
+        iterations (int): Number of iterations for erosion used for the brightness computation
+        stats (ConversionStats): Optional stats object recording the time spent per stage (default: None)
+    Returns:
+        numpy.ndarray: ASCII art frames (N, H, W), or glyph indices (N, rows, cols) if render is False
+    """
+    _, height, width = gray_frames.shape
+    size_sub_image_width, size_sub_image_height = get_tile_size(width, num_sub_images_width, get_aspect_ratio_of_ascii_image())
+    
+    with stage(stats, 'load_glyphs'):
+        _, brightness_values, glyph_stack = load_glyph_atlas(ascii_images_dir, size_sub_image_width, size_sub_image_height,
+                                                             kernel_size, iterations)
+    
+    with stage(stats, 'tile_stats'):
+        tile_means = batch_tile_means(gray_frames, size_sub_image_width, size_sub_image_height)
+    
+    with stage(stats, 'match'):
+        glyph_indices = match_glyph_indices(tile_means, brightness_values)
+    
+    if not render:
+        return glyph_indices
+    
+    with stage(stats, 'assemble'):
+        return assemble_glyphs(glyph_indices, glyph_stack, height, width)
+
+class FrameBatchPipeline:
+    """
+    Convert batches of grayscale frames, optionally on worker threads, and write the results in submission order.
+
+    Args:
+        out: cv2.VideoWriter for rendered frames or GlyphVideoWriter for glyph indices
+        ascii_images_dir (str): Directory containing ASCII character images
+        glyph_output (bool): Whether ``out`` expects glyph indices instead of rendered frames
+        num_workers (int): Number of conversion threads, 1 converts synchronously on the calling thread
+        stats (ConversionStats): Optional stats object recording per-stage timings and the number of batches in flight.
+                                 With num_workers > 1 the worker threads record their stages concurrently
+    """
+
+    def __init__(self, out, ascii_images_dir, glyph_output=False, num_workers=1, stats=None):
+        self.out = out
+        self.ascii_images_dir = ascii_images_dir
+        self.glyph_output = glyph_output
+        self.num_workers = num_workers
+        self.stats = stats
+        self.frames_written = 0
+        self._executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix='ascii_frames') if num_workers > 1 else None
+        self._in_flight = deque()
+
+    def submit(self, gray_frames, num_sub_images_width):
+        """ Convert a batch (the array must not be modified afterwards) and write every batch that is done in order. """
+        if self._executor is None:
+            self._write(convert_frame_batch(gray_frames, self.ascii_images_dir, num_sub_images_width,
+                                            render=not self.glyph_output, stats=self.stats))
+            return
+        self._in_flight.append(self._executor.submit(convert_frame_batch, gray_frames, self.ascii_images_dir,
+                                                     num_sub_images_width, not self.glyph_output, stats=self.stats))
+        if self.stats is not None:
+            self.stats.record_queue_depth('workers', len(self._in_flight))
+        # Keep at most one batch per worker in flight, the decoding thread waits for the oldest one
+        while len(self._in_flight) > self.num_workers:
+            self._write(self._in_flight.popleft().result())
+
+    def flush(self):
+        """ Wait for all batches in flight and write them. """
+        while self._in_flight:
+            self._write(self._in_flight.popleft().result())
+
+    def close(self):
+        """ Drop unfinished batches and stop the worker threads. """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        self._in_flight.clear()
+
+    def _write(self, ascii_frames):
+        for ascii_frame in ascii_frames:
+            with stage(self.stats, 'encode'):
+                self.out.write(ascii_frame)
+            if self.stats is not None:
+                self.stats.frame_done()
+        self.frames_written += len(ascii_frames)
+
+def open_glyph_video_writer(output_path, fps, frame_size, num_sub_images_width, ascii_images_dir, kernel_size=3, iterations=4):
+    """
+    Create a GlyphVideoWriter whose glyph atlas matches the indices produced by match_tiles.
+    Args:
+        output_path (str): Path of the glyph-index video
+        fps (float): Frames per second
+        frame_size (tuple): (width, height) of the source frames
+        num_sub_images_width (int): Number of sub-images in width dimension
+        ascii_images_dir (str): Directory containing ASCII character images
+        kernel_size (int): Size of the kernel for erosion used for the brightness computation
+        iterations (int): Number of iterations for erosion used for the brightness computation
+    Returns:
+        GlyphVideoWriter: Writer accepting one array of glyph indices per frame
+    """
+    tile_size = get_tile_size(frame_size[0], num_sub_images_width, get_aspect_ratio_of_ascii_image())
+    glyph_filenames, glyph_images = load_sorted_glyph_images(ascii_images_dir, kernel_size, iterations)
+    return GlyphVideoWriter(output_path, fps, frame_size, tile_size, glyph_filenames, glyph_images)
+
+def load_sorted_glyph_images(ascii_images_dir, kernel_size=3, iterations=4):
+    """
+    Load the unscaled ASCII images in the brightness order used for glyph indices.
+    Args:
+        ascii_images_dir (str): Directory containing ASCII character images
+        kernel_size (int): Size of the kernel for erosion used for the brightness computation
+        iterations (int): Number of iterations for erosion used for the brightness computation
+    Returns:
+        tuple: (list of filenames, list of grayscale images)
+    """
+    _, sorted_brightness = load_glyph_brightness(ascii_images_dir, kernel_size, iterations)
+    glyph_filenames = [filename for filename, _ in sorted_brightness]
+    glyph_images = [cv2.imread(os.path.join(ascii_images_dir, filename), cv2.IMREAD_GRAYSCALE) for filename in glyph_filenames]
+    return glyph_filenames, glyph_images
+
+class VideoOutputSpec:
+    """
+    One output of convert_video_to_ascii_multi.
+
+    Args:
+        output_video_path (str): Path of the output video (.mp4, .avi, or .agv for a glyph-index video)
+        num_sub_images_width (int): ASCII resolution of this output (default: 100)
+        ascii_images_dir (str): Directory with the ASCII images, i.e. the character set (default: package ascii_images)
+        output_width (int): Width of the rendered video, the height keeps the aspect ratio, e.g. for thumbnails.
+                            Not available for .agv output, which is rendered later (default: source width)
+        compress_output (bool): Whether to compress the output video (default: True)
+        compression_level (str): Compression level - 'low', 'medium', 'high' (default: 'medium')
+        kernel_size (int): Size of the kernel for erosion used for the brightness computation (default: 3)
+        iterations (int): Number of iterations for erosion used for the brightness computation (default: 4)
+    """
+
+    def __init__(self, output_video_path, num_sub_images_width=100, ascii_images_dir=None, output_width=None,
+                 compress_output=True, compression_level='medium', kernel_size=3, iterations=4):
+        if ascii_images_dir is None:
+            ascii_images_dir = os.path.join(os.path.dirname(__file__), 'ascii_images')
+        assert output_video_path.lower().endswith(('.mp4', '.avi', GLYPH_VIDEO_EXTENSION)), "Output video format must be .mp4, .avi or .agv"
+        assert num_sub_images_width > 0, "num_sub_images_width must be greater than 0"
+        assert os.path.exists(ascii_images_dir), f"ASCII images directory does not exist: {ascii_images_dir}"
+        assert output_width is None or output_width > 0, "output_width must be greater than 0"
+        self.output_video_path = output_video_path
+        self.num_sub_images_width = num_sub_images_width
+        self.ascii_images_dir = ascii_images_dir
+        self.output_width = output_width
+        self.compress_output = compress_output
+        self.compression_level = compression_level
+        self.kernel_size = kernel_size
+        self.iterations = iterations
+        self.glyph_output = output_video_path.lower().endswith(GLYPH_VIDEO_EXTENSION)
+        assert not (self.glyph_output and output_width is not None), "output_width is chosen when rendering a .agv video"
+
+class _VideoOutput:
+    """ Writer of one VideoOutputSpec, matching and rendering the shared tile statistics of every frame. """
+
+    def __init__(self, spec, fps, frame_size):
+        self.spec = spec
+        width, height = frame_size
+        if spec.glyph_output:
+            self.render = None
+            self.out = open_glyph_video_writer(spec.output_video_path, fps, frame_size, spec.num_sub_images_width,
+                                               spec.ascii_images_dir, spec.kernel_size, spec.iterations)
+            return
+
+        tile_size = get_tile_size(width, spec.num_sub_images_width, get_aspect_ratio_of_ascii_image())
+        if spec.output_width is None or spec.output_width == width:
+            output_size = frame_size
+            _, _, glyph_stack = load_glyph_atlas(spec.ascii_images_dir, tile_size[0], tile_size[1], spec.kernel_size, spec.iterations)
+            self.render = lambda glyph_indices: assemble_glyphs(glyph_indices, glyph_stack, height, width)
+        else:
+            output_size = (spec.output_width, max(1, int(round(height * spec.output_width / width))))
+            _, glyph_images = load_sorted_glyph_images(spec.ascii_images_dir, spec.kernel_size, spec.iterations)
+            self.render = make_glyph_renderer(glyph_images, tile_size, frame_size, output_size)
+        self.out = cv2.VideoWriter(spec.output_video_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, output_size, isColor=False)
+
+    def write(self, tile_statistics, stats=None):
+        spec = self.spec
+        glyph_indices, _ = match_tiles(tile_statistics, spec.ascii_images_dir, spec.num_sub_images_width,
+                                       spec.kernel_size, spec.iterations, stats)
+        if self.render is not None:
+            with stage(stats, 'assemble'):
+                glyph_indices = self.render(glyph_indices)
+        with stage(stats, 'encode'):
+            self.out.write(glyph_indices)
+
+    def release(self):
+        self.out.release()
+
+def convert_video_to_ascii_multi(input_video_path, outputs, start_time=0.0, end_time=None, speed_multiplier=1.0,
+                                 stats=None, show_progress=True, verbose=True, cancel_event=None):
+    """
+    Convert a video to several ASCII videos at once, e.g. a full-size video plus a thumbnail or other character sets.
+    Every frame is decoded and turned into tile statistics (an integral image) once; each output then only
+    looks up its tile means, matches them to its characters and renders and encodes its own frame.
+    Args:
+        input_video_path (str): Path to the input video file
+        outputs (list): VideoOutputSpec objects, or dictionaries with the arguments of VideoOutputSpec
+        start_time (float): Start time in seconds (default: 0.0)
+        end_time (float): End time in seconds (default: None - full video)
+        speed_multiplier (float): Speed multiplier - 1.0 = normal, 2.0 = 2x speed (default: 1.0)
+        stats (ConversionStats): Optional stats object, stage timings are summed over all outputs (default: None)
+        show_progress (bool): Whether to show a tqdm progress bar (default: True)
+        verbose (bool): Whether to print status and compression messages (default: True)
+        cancel_event (threading.Event): Optional event, once set the conversion stops after the current frame (default: None)
+    Returns:
+        list: True or False per output, in the order of ``outputs``
+    """
+    outputs = [spec if isinstance(spec, VideoOutputSpec) else VideoOutputSpec(**spec) for spec in outputs]
+    assert outputs, "At least one output is required"
+    assert len({os.path.abspath(spec.output_video_path) for spec in outputs}) == len(outputs), "Output paths must be distinct"
+    assert speed_multiplier >= 1.0, "Speed multiplier must be greater than 1.0. Slowing down videos is not supported."
+    assert os.path.exists(input_video_path), f"Input video file does not exist: {input_video_path}"
+    assert input_video_path.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')), "Unsupported video format. Supported formats: .mp4, .avi, .mov, .mkv"
+    assert start_time >= 0, "Start time must be non-negative"
+    assert end_time is None or end_time > start_time, "End time must be greater than start time"
+    cap = cv2.VideoCapture(input_video_path)
+    if not cap.isOpened():
+        if verbose:
+            print(f"Error: Could not open video file: {input_video_path}")
+        return [False] * len(outputs)
+    
+    fps = int(cap.get(cv2.CAP_PROP_FPS))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if end_time is None:
+        end_time = total_frames / fps
+    start_frame = int(start_time * fps)
+    end_frame = min(int(end_time * fps), total_frames - 1)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    
+    frame_count = start_frame
+    writers = []
+    progress_bar = tqdm(total=end_frame-start_frame, desc="Converting frames", unit="frames", disable=not show_progress)
+    success = False
+    cancelled = False
+    try:
+        for spec in outputs:
+            writers.append(_VideoOutput(spec, fps, (width, height)))
+        
+        while frame_count <= end_frame:
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                break
             
-            compressed_path = compress_video(
-                input_path=output_video_path,
-                compression_level=compression_level
-            )
+            with stage(stats, 'decode'):
+                ret, frame = cap.read()
+            if not ret:
+                break
             
-            if compressed_path and os.path.exists(compressed_path):
-                # Get compressed file size
-                compressed_size = os.path.getsize(compressed_path)
-                
-                # Calculate savings
-                size_saved = original_size - compressed_size
-                percentage_saved = (size_saved / original_size) * 100 if original_size > 0 else 0
-                
-                # Replace original with compressed version
-                if os.path.exists(output_video_path):
-                    os.remove(output_video_path)
-                os.rename(compressed_path, output_video_path)
-                
-                # Print compression results
-                print(f"Original size: {original_size / (1024*1024):.2f} MB → Compressed size: {compressed_size / (1024*1024):.2f} MB")
-            else:
-                print("Compression failed, keeping original video")
-        except Exception as e:
-            print(f"Compression error: {e}, keeping original video")
+            if (frame_count - start_frame) % int(speed_multiplier) != 0:
+                frame_count += 1
+                progress_bar.update(1)
+                if stats is not None:
+                    stats.frame_skipped()
+                continue
+            
+            with stage(stats, 'decode'):
+                gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            # Shared by all outputs, every further resolution costs O(1) per tile
+            with stage(stats, 'tile_stats'):
+                tile_statistics = TileStatistics(gray_frame)
+            for writer in writers:
+                writer.write(tile_statistics, stats)
+            if stats is not None:
+                stats.frame_done()
+            
+            frame_count += 1
+            progress_bar.update(1)
+        
+        progress_bar.close()
+        success = not cancelled
+        if cancelled and verbose:
+            print("Video conversion cancelled")
     
-    return success
+    except Exception as e:
+        if verbose:
+            print(f"Error during video processing: {e}")
+        success = False
+    
+    finally:
+        cap.release()
+        for writer in writers:
+            writer.release()
+    
+    results = []
+    for spec in outputs:
+        written = success and os.path.exists(spec.output_video_path)
+        if written and spec.compress_output and not spec.glyph_output:
+            compress_video_in_place(spec.output_video_path, spec.compression_level, stats, show_progress, verbose)
+        if written and stats is not None:
+            stats.add_bytes_written(os.path.getsize(spec.output_video_path))
+        results.append(written)
+    return results
 
 # Example usage
 if __name__ == "__main__":
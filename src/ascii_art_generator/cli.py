@@ -0,0 +1,137 @@
+import argparse
+import json
+import os
+import sys
+
+from .ascii_art_generator_autotune import convert_video_to_ascii_tuned
+from .ascii_art_generator_image import generate_ascii_art
+from .ascii_art_generator_service import serve
+from .ascii_art_generator_video import convert_video_to_ascii
+from .utils_glyph_video import glyph_video_to_text, render_glyph_video
+
+
+def build_parser():
+    """ Build the argument parser of the ``ascii-art-generator`` command. """
+    parser = argparse.ArgumentParser(prog='ascii-art-generator', description='Convert images and videos to ASCII art.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    image_parser = subparsers.add_parser('image', help='Convert a single image')
+    image_parser.add_argument('image_path', help='Path to the input image')
+    image_parser.add_argument('-o', '--output', default='generated_ascii_art_image.png', help='Path of the generated ASCII art image')
+    image_parser.add_argument('-w', '--width', type=int, default=200, help='Number of ASCII characters per row (default: 200)')
+    image_parser.add_argument('--ascii-images-dir', default=None, help='Directory containing ASCII character images')
+    image_parser.add_argument('--kernel-size', type=int, default=3, help='Erosion kernel size for the brightness computation')
+    image_parser.add_argument('--iterations', type=int, default=4, help='Erosion iterations for the brightness computation')
+    image_parser.add_argument('--plot', action='store_true', help='Show the original and ASCII image with matplotlib')
+    image_parser.add_argument('--full-decode', action='store_true', help='Always decode the full-resolution color image')
+
+    video_parser = subparsers.add_parser('video', help='Convert a video')
+    video_parser.add_argument('input_video_path', help='Path to the input video (.mp4, .avi, .mov, .mkv)')
+    video_parser.add_argument('output_video_path', help='Path of the ASCII video (.mp4, .avi, or .agv for a glyph-index video)')
+    video_parser.add_argument('-w', '--width', type=int, default=100, help='Number of ASCII characters per row (default: 100)')
+    video_parser.add_argument('--start', type=float, default=0.0, help='Start time in seconds')
+    video_parser.add_argument('--end', type=float, default=None, help='End time in seconds (default: end of video)')
+    video_parser.add_argument('--speed', type=float, default=1.0, help='Speed multiplier, only every n-th frame is converted')
+    video_parser.add_argument('--ascii-images-dir', default=None, help='Directory containing ASCII character images')
+    video_parser.add_argument('--no-compress', action='store_true', help='Keep the uncompressed output video')
+    video_parser.add_argument('--compression-level', default='medium', choices=['low', 'medium', 'high'])
+    video_parser.add_argument('--batch-size', type=int, default=1, help='Number of frames converted together (default: 1)')
+    video_parser.add_argument('--workers', type=int, default=1, help='Number of threads converting frames (default: 1)')
+    video_parser.add_argument('--target-fps', type=float, default=None,
+                              help='Calibrate width, batch size and workers to reach this frame rate and adapt them while running')
+    video_parser.add_argument('--time-budget', type=float, default=None,
+                              help='Like --target-fps, but derived from a wall-clock budget in seconds for the whole video')
+    video_parser.add_argument('--calibration-cache', default=None, help='JSON file caching calibration results per host type')
+    video_parser.add_argument('--tune-report', default=None, help='Write the chosen settings and measured rates to this JSON file')
+    video_parser.add_argument('-q', '--quiet', action='store_true', help='Disable the progress bar and status messages')
+
+    render_parser = subparsers.add_parser('render', help='Replay a glyph-index video (.agv) as video or text')
+    render_parser.add_argument('input_path', help='Path of the glyph-index video')
+    render_parser.add_argument('output_video_path', nargs='?', default=None, help='Path of the rendered video (.mp4, .avi)')
+    render_parser.add_argument('-w', '--width', type=int, default=None, help='Width of the rendered video (default: source width)')
+    render_parser.add_argument('--text', action='store_true', help='Print the frames as text instead of rendering a video')
+    render_parser.add_argument('--no-compress', action='store_true', help='Keep the uncompressed output video')
+    render_parser.add_argument('--compression-level', default='medium', choices=['low', 'medium', 'high'])
+    render_parser.add_argument('-q', '--quiet', action='store_true', help='Disable the progress bar and status messages')
+
+    serve_parser = subparsers.add_parser('serve', help='Run a long-lived conversion service with a warm glyph cache')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Host to listen on (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    serve_parser.add_argument('--unix-socket', default=None, help='Listen on this Unix domain socket instead of TCP')
+    serve_parser.add_argument('--ascii-images-dir', default=None, help='Default directory containing ASCII character images')
+    serve_parser.add_argument('--max-workers', type=int, default=2, help='Maximum number of concurrent conversions')
+    serve_parser.add_argument('--max-queue', type=int, default=8, help='Maximum number of waiting jobs before rejecting')
+    return parser
+
+
+def main(argv=None):
+    """ Entry point of the ``ascii-art-generator`` console script. """
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'image':
+        ascii_images_dir = args.ascii_images_dir
+        if ascii_images_dir is None:
+            ascii_images_dir = os.path.join(os.path.dirname(__file__), 'ascii_images')
+        generate_ascii_art(
+            image_path=args.image_path,
+            ascii_images_dir=ascii_images_dir,
+            num_sub_images_width=args.width,
+            kernel_size=args.kernel_size,
+            iterations=args.iterations,
+            output_path=args.output,
+            plot_enabled=args.plot,
+            save_enabled=True,
+            decode_mode='full' if args.full_decode else 'auto'
+        )
+        print(f"ASCII art saved to {args.output}")
+        return 0
+
+    if args.command == 'video':
+        options = dict(
+            start_time=args.start,
+            end_time=args.end,
+            speed_multiplier=args.speed,
+            ascii_images_dir=args.ascii_images_dir,
+            compress_output=not args.no_compress,
+            compression_level=args.compression_level,
+            show_progress=not args.quiet,
+            verbose=not args.quiet
+        )
+        if args.target_fps is None and args.time_budget is None and args.tune_report is None:
+            success = convert_video_to_ascii(args.input_video_path, args.output_video_path, num_sub_images_width=args.width,
+                                             batch_size=args.batch_size, num_workers=args.workers, **options)
+            return 0 if success else 1
+
+        success, report = convert_video_to_ascii_tuned(args.input_video_path, args.output_video_path,
+                                                       target_fps=args.target_fps, time_budget=args.time_budget,
+                                                       num_sub_images_width=args.width,
+                                                       calibration_cache=args.calibration_cache, **options)
+        if not args.quiet:
+            settings, run = report['run']['final_settings'], report['run']
+            print(f"Calibrated settings: {report['settings']} (estimated {report['estimated_fps']:.1f} fps)")
+            print(f"Measured {run['fps']:.1f} fps, final settings: {settings}")
+        if args.tune_report is not None:
+            with open(args.tune_report, 'w') as f:
+                json.dump(report, f, indent=2)
+        return 0 if success else 1
+
+    if args.command == 'render':
+        if args.text:
+            for frame_text in glyph_video_to_text(args.input_path):
+                print(frame_text, end='\n\n')
+            return 0
+        if args.output_video_path is None:
+            build_parser().error("render needs an output video path unless --text is given")
+        success = render_glyph_video(args.input_path, args.output_video_path, output_width=args.width,
+                                     compress_output=not args.no_compress, compression_level=args.compression_level,
+                                     show_progress=not args.quiet, verbose=not args.quiet)
+        return 0 if success else 1
+
+    if args.command == 'serve':
+        serve(host=args.host, port=args.port, unix_socket=args.unix_socket, ascii_images_dir=args.ascii_images_dir,
+              max_workers=args.max_workers, max_queue=args.max_queue)
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
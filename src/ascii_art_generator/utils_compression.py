@@ -2,6 +2,8 @@ import cv2
 import os
 from tqdm import tqdm
 
+from .utils_metrics import stage
+
 try:
     import ffmpeg
     FFMPEG_AVAILABLE = True
@@ -9,7 +11,7 @@ except ImportError:
     FFMPEG_AVAILABLE = False
 
 
-def compress_video(input_path, output_path=None, compression_level='medium'):
+def compress_video(input_path, output_path=None, compression_level='medium', stats=None, show_progress=True, verbose=True):
     """
     Compress a video file to reduce file size using ffmpeg (preferred) or OpenCV (fallback).
     
@@ -17,10 +19,65 @@ def compress_video(input_path, output_path=None, compression_level='medium'):
         input_path (str): Path to the input video file
         output_path (str): Path for compressed output (default: adds '_compressed' suffix)
         compression_level (str): Compression level - 'low', 'medium', 'high' (default: 'medium')
+        stats (ConversionStats): Optional stats object, the compression time is recorded as stage 'compress'
+        show_progress (bool): Whether to show a tqdm progress bar for the OpenCV fallback (default: True)
+        verbose (bool): Whether to print status messages (default: True)
         
     Returns:
         str: Path to the compressed video file, or None if compression failed
     """
+    with stage(stats, 'compress'):
+        return _compress_video(input_path, output_path, compression_level, show_progress, verbose)
+
+
+def compress_video_in_place(output_video_path, compression_level='medium', stats=None, show_progress=True, verbose=True):
+    """
+    Compress a written video and replace it with the compressed version, the original is kept if compression fails.
+    Args:
+        output_video_path (str): Path of the video to compress
+        compression_level (str): Compression level - 'low', 'medium', 'high' (default: 'medium')
+        stats (ConversionStats): Optional stats object recording the compression time (default: None)
+        show_progress (bool): Whether to show a tqdm progress bar (default: True)
+        verbose (bool): Whether to print status and compression messages (default: True)
+    """
+    try:
+        # Get original file size before compression
+        original_size = os.path.getsize(output_video_path)
+        
+        compressed_path = compress_video(
+            input_path=output_video_path,
+            compression_level=compression_level,
+            stats=stats,
+            show_progress=show_progress,
+            verbose=verbose
+        )
+        
+        if compressed_path and os.path.exists(compressed_path):
+            # Get compressed file size
+            compressed_size = os.path.getsize(compressed_path)
+            
+            # Calculate savings
+            size_saved = original_size - compressed_size
+            percentage_saved = (size_saved / original_size) * 100 if original_size > 0 else 0
+            
+            # Replace original with compressed version
+            if os.path.exists(output_video_path):
+                os.remove(output_video_path)
+            os.rename(compressed_path, output_video_path)
+            
+            # Print compression results
+            if verbose:
+                print(f"Original size: {original_size / (1024*1024):.2f} MB → Compressed size: {compressed_size / (1024*1024):.2f} MB")
+        elif verbose:
+            print("Compression failed, keeping original video")
+    except Exception as e:
+        if verbose:
+            print(f"Compression error: {e}, keeping original video")
+
+
+def _compress_video(input_path, output_path, compression_level, show_progress, verbose):
+    """ Implementation of compress_video, see there for the arguments. """
+    log = print if verbose else _silent
     if output_path is None:
         name, ext = os.path.splitext(input_path)
         output_path = f"{name}_compressed{ext}"
@@ -38,7 +95,7 @@ def compress_video(input_path, output_path=None, compression_level='medium'):
             else:
                 crf = 28  # Default to medium
             
-            print(f"Compressing video with ffmpeg (CRF: {crf})...")
+            log(f"Compressing video with ffmpeg (CRF: {crf})...")
             (
                 ffmpeg
                 .input(input_path)
@@ -49,20 +106,20 @@ def compress_video(input_path, output_path=None, compression_level='medium'):
             if os.path.exists(output_path):
                 return output_path
             else:
-                print("FFmpeg compression failed - output file not created")
-                print("Falling back to OpenCV compression...")
+                log("FFmpeg compression failed - output file not created")
+                log("Falling back to OpenCV compression...")
                 
         except Exception as e:
-            print(f"FFmpeg compression error: {e}")
-            print("Falling back to OpenCV compression...")
+            log(f"FFmpeg compression error: {e}")
+            log("Falling back to OpenCV compression...")
     else:
-        print("FFmpeg not available, using OpenCV compression...")
+        log("FFmpeg not available, using OpenCV compression...")
     
     # Fallback to OpenCV compression
     try:        
         cap = cv2.VideoCapture(input_path)
         if not cap.isOpened():
-            print(f"Error: Could not open video for compression: {input_path}")
+            log(f"Error: Could not open video for compression: {input_path}")
             return None
         
         # Get video properties
@@ -86,7 +143,7 @@ def compress_video(input_path, output_path=None, compression_level='medium'):
         out = cv2.VideoWriter(output_path, fourcc, fps, (width, height), isColor=True)
         
         frame_count = 0
-        progress_bar = tqdm(total=total_frames, desc="Compressing frames", unit="frames")
+        progress_bar = tqdm(total=total_frames, desc="Compressing frames", unit="frames", disable=not show_progress)
         
         while True:
             ret, frame = cap.read()
@@ -111,9 +168,13 @@ def compress_video(input_path, output_path=None, compression_level='medium'):
         if os.path.exists(output_path):
             return output_path
         else:
-            print("OpenCV compression failed - output file not created")
+            log("OpenCV compression failed - output file not created")
             return None
         
     except Exception as e:
-        print(f"OpenCV compression error: {e}")
-        return None
\ No newline at end of file
+        log(f"OpenCV compression error: {e}")
+        return None
+
+
+def _silent(*args, **kwargs):
+    """ Drop-in replacement for print used when verbose output is disabled. """
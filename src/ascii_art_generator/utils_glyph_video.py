@@ -0,0 +1,272 @@
+import json
+import os
+import re
+import struct
+import zlib
+
+import cv2
+import numpy as np
+from tqdm import tqdm
+
+from .utils_compression import compress_video_in_place
+from .utils_tile_stats import assemble_glyphs
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+# File layout of a glyph-index video (.agv):
+#   magic b'AGV1'
+#   uint32 header length, JSON header (fps, source frame size, grid shape, tile size, codec, glyph list)
+#   uint32 atlas length, PNG of all glyph images side by side in index order
+#   chunks until EOF: uint32 number of frames, uint32 payload length, compressed payload
+# A chunk payload is a (frames, rows, cols) uint8 array of glyph indices, delta-encoded along the time axis
+# (first frame stored as is, every further frame as difference to its predecessor modulo 256), so every chunk
+# can be decoded on its own.
+GLYPH_VIDEO_MAGIC = b'AGV1'
+GLYPH_VIDEO_EXTENSION = '.agv'
+_UINT32 = struct.Struct('<I')
+_CHUNK_HEADER = struct.Struct('<II')
+
+
+def _compress(data, codec):
+    if codec == 'zlib':
+        return zlib.compress(data, 6)
+    if codec == 'lz4':
+        return lz4.frame.compress(data)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def _decompress(data, codec):
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    if codec == 'lz4':
+        if not LZ4_AVAILABLE:
+            raise ValueError("This glyph video is lz4 compressed, install the 'lz4' package to read it")
+        return lz4.frame.decompress(data)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def char_from_glyph_filename(filename):
+    """ Return the character of an ASCII image file named like 'ascii_065_A.png', or '?' if it cannot be parsed. """
+    match = re.match(r'ascii_(\d{3})', os.path.basename(filename))
+    return chr(int(match.group(1))) if match else '?'
+
+
+class GlyphVideoWriter:
+    """
+    Writer for glyph-index videos: the ASCII character images are stored once, every frame only as a grid of indices.
+
+    Args:
+        path (str): Output path, usually ending with '.agv'
+        fps (float): Frames per second
+        frame_size (tuple): (width, height) of the source frames, the default size for rendering
+        tile_size (tuple): (width, height) of one sub-image in source pixels
+        glyph_filenames (list): Filenames of the ASCII images in index order
+        glyph_images (list): Grayscale ASCII images in index order, all of the same size
+        codec (str): Chunk compression, 'zlib' or 'lz4' (default: 'zlib')
+        chunk_frames (int): Number of frames per independently decodable chunk (default: 64)
+    """
+
+    def __init__(self, path, fps, frame_size, tile_size, glyph_filenames, glyph_images, codec='zlib', chunk_frames=64):
+        assert len(glyph_images) <= 256, "Glyph-index videos support at most 256 ASCII images"
+        assert codec in ('zlib', 'lz4'), "Codec must be 'zlib' or 'lz4'"
+        assert codec != 'lz4' or LZ4_AVAILABLE, "The 'lz4' package is not installed"
+        assert chunk_frames > 0, "chunk_frames must be greater than 0"
+        width, height = frame_size
+        tile_width, tile_height = tile_size
+        self.grid_shape = (int(np.ceil(height / tile_height)), int(np.ceil(width / tile_width)))
+        self.codec = codec
+        self.chunk_frames = chunk_frames
+        self.frames_written = 0
+        self._pending = []
+
+        header = {
+            'version': 1,
+            'fps': fps,
+            'frame_size': [width, height],
+            'tile_size': [tile_width, tile_height],
+            'grid_shape': list(self.grid_shape),
+            'codec': codec,
+            'glyphs': [{'filename': filename, 'char': char_from_glyph_filename(filename)} for filename in glyph_filenames],
+        }
+        success, atlas = cv2.imencode('.png', np.hstack(glyph_images))
+        if not success:
+            raise ValueError("Could not encode the glyph atlas")
+        header_bytes = json.dumps(header).encode('utf-8')
+        atlas_bytes = atlas.tobytes()
+
+        self._file = open(path, 'wb')
+        self._file.write(GLYPH_VIDEO_MAGIC)
+        self._file.write(_UINT32.pack(len(header_bytes)))
+        self._file.write(header_bytes)
+        self._file.write(_UINT32.pack(len(atlas_bytes)))
+        self._file.write(atlas_bytes)
+
+    def write(self, glyph_indices):
+        """ Append one frame given as (rows, cols) array of glyph indices. """
+        assert glyph_indices.shape == self.grid_shape, f"Expected a glyph grid of shape {self.grid_shape}, got {glyph_indices.shape}"
+        self._pending.append(glyph_indices.astype(np.uint8))
+        if len(self._pending) >= self.chunk_frames:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        frames = np.stack(self._pending)
+        deltas = frames.copy()
+        deltas[1:] -= frames[:-1]  # uint8 arithmetic wraps around, decoded again by a cumulative sum
+        payload = _compress(deltas.tobytes(), self.codec)
+        self._file.write(_CHUNK_HEADER.pack(len(self._pending), len(payload)))
+        self._file.write(payload)
+        self.frames_written += len(self._pending)
+        self._pending = []
+
+    def release(self):
+        """ Write the remaining frames and close the file. """
+        if not self._file.closed:
+            self._flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class GlyphVideoReader:
+    """
+    Reader for glyph-index videos written by GlyphVideoWriter.
+    Iterating over the reader yields one (rows, cols) uint8 array of glyph indices per frame.
+
+    Args:
+        path (str): Path of the glyph-index video
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            if self._file.read(len(GLYPH_VIDEO_MAGIC)) != GLYPH_VIDEO_MAGIC:
+                raise ValueError(f"Not a glyph-index video: {path}")
+            header = json.loads(self._read_block())
+            atlas = cv2.imdecode(np.frombuffer(self._read_block(), dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        except Exception:
+            self._file.close()
+            raise
+        self.header = header
+        self.fps = header['fps']
+        self.frame_size = tuple(header['frame_size'])
+        self.tile_size = tuple(header['tile_size'])
+        self.grid_shape = tuple(header['grid_shape'])
+        self.codec = header['codec']
+        self.glyph_filenames = [glyph['filename'] for glyph in header['glyphs']]
+        self.glyph_chars = [glyph['char'] for glyph in header['glyphs']]
+        self.glyph_images = np.hsplit(atlas, len(self.glyph_filenames))
+        self._frames_start = self._file.tell()
+
+    def _read_block(self):
+        (length,) = _UINT32.unpack(self._file.read(_UINT32.size))
+        return self._file.read(length)
+
+    def __iter__(self):
+        self._file.seek(self._frames_start)
+        rows, cols = self.grid_shape
+        while True:
+            chunk_header = self._file.read(_CHUNK_HEADER.size)
+            if len(chunk_header) < _CHUNK_HEADER.size:
+                return
+            num_frames, payload_length = _CHUNK_HEADER.unpack(chunk_header)
+            deltas = np.frombuffer(_decompress(self._file.read(payload_length), self.codec), dtype=np.uint8)
+            frames = np.cumsum(deltas.reshape(num_frames, rows, cols), axis=0, dtype=np.uint8)
+            yield from frames
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def make_glyph_renderer(glyph_images, tile_size, frame_size, output_size=None):
+    """
+    Prepare rasterizing frames of glyph indices at a given output size.
+    The glyphs are scaled once, after which every frame is only an index lookup.
+    Args:
+        glyph_images (list): Unscaled grayscale ASCII images in index order
+        tile_size (tuple): (width, height) of one sub-image in source pixels
+        frame_size (tuple): (width, height) of the source frame
+        output_size (tuple): (width, height) of the rendered frames (default: frame_size)
+    Returns:
+        callable: Function mapping a (rows, cols) array of glyph indices to a rendered grayscale frame
+    """
+    if output_size is None:
+        output_size = frame_size
+    output_size = tuple(output_size)
+    cell_width = max(1, int(round(tile_size[0] * output_size[0] / frame_size[0])))
+    cell_height = max(1, int(round(tile_size[1] * output_size[1] / frame_size[1])))
+    glyph_stack = np.stack([cv2.resize(glyph, (cell_width, cell_height)) for glyph in glyph_images])
+
+    def render(glyph_indices):
+        rows, cols = glyph_indices.shape
+        frame = assemble_glyphs(glyph_indices, glyph_stack, min(rows * cell_height, output_size[1]), min(cols * cell_width, output_size[0]))
+        # Rounding the cell size may leave the grid slightly off the requested size
+        if frame.shape[::-1] != output_size:
+            frame = cv2.resize(frame, output_size, interpolation=cv2.INTER_AREA)
+        return frame
+
+    return render
+
+
+def render_glyph_video(input_path, output_video_path, output_width=None, compress_output=True, compression_level='medium',
+                       show_progress=True, verbose=True):
+    """
+    Rasterize a glyph-index video to a regular video file at any resolution.
+    Args:
+        input_path (str): Path of the glyph-index video (.agv)
+        output_video_path (str): Path of the rendered video (.mp4 or .avi)
+        output_width (int): Width of the rendered video, the height keeps the aspect ratio (default: source width)
+        compress_output (bool): Whether to compress the rendered video (default: True)
+        compression_level (str): Compression level - 'low', 'medium', 'high' (default: 'medium')
+        show_progress (bool): Whether to show a tqdm progress bar (default: True)
+        verbose (bool): Whether to print status messages (default: True)
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    assert output_video_path.lower().endswith(('.mp4', '.avi')), "Output video format must be .mp4 or .avi"
+    with GlyphVideoReader(input_path) as reader:
+        width, height = reader.frame_size
+        if output_width is None:
+            output_width = width
+        output_size = (output_width, max(1, int(round(height * output_width / width))))
+        render = make_glyph_renderer(reader.glyph_images, reader.tile_size, reader.frame_size, output_size)
+
+        out = cv2.VideoWriter(output_video_path, cv2.VideoWriter_fourcc(*'mp4v'), reader.fps, output_size, isColor=False)
+        try:
+            for glyph_indices in tqdm(reader, desc="Rendering frames", unit="frames", disable=not show_progress):
+                out.write(render(glyph_indices))
+        finally:
+            out.release()
+
+    if compress_output and os.path.exists(output_video_path):
+        compress_video_in_place(output_video_path, compression_level, show_progress=show_progress, verbose=verbose)
+    return os.path.exists(output_video_path)
+
+
+def glyph_video_to_text(input_path):
+    """
+    Yield every frame of a glyph-index video as text, one line per row of ASCII characters.
+    Args:
+        input_path (str): Path of the glyph-index video (.agv)
+    Yields:
+        str: The frame as multi-line string
+    """
+    with GlyphVideoReader(input_path) as reader:
+        chars = np.array(reader.glyph_chars)
+        for glyph_indices in reader:
+            yield '\n'.join(''.join(row) for row in chars[glyph_indices])
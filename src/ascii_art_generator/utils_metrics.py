@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Shared no-op context manager used when no stats object is passed, so disabled instrumentation costs a single call
+_NULL_STAGE = nullcontext()
+
+
+class ConversionStats:
+    """
+    Collect per-stage timings and counters of an image or video conversion.
+
+    Pass an instance as ``stats`` to ``generate_ascii_art``, ``convert_video_to_ascii`` or ``compress_video``
+    and inspect it afterwards (or while running via ``callback``). Updates are thread-safe, so one instance
+    can be shared by the worker threads of a conversion.
+
+    Args:
+        callback (callable): Optional function called as ``callback(stats)`` after every finished frame
+        log_level (int): Logging level used for per-frame and summary messages, None disables logging (default: None)
+    """
+
+    def __init__(self, callback=None, log_level=None):
+        self.callback = callback
+        self.log_level = log_level
+        self.stage_totals = {}      # stage name -> cumulative seconds
+        self.stage_counts = {}      # stage name -> number of times the stage ran
+        self.stage_max = {}         # stage name -> slowest single run in seconds
+        self.frame_times = []       # wall time of every finished frame in seconds
+        self.queue_depths = {}      # queue name -> (current depth, maximum depth)
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.start_time = time.perf_counter()
+        self._frame_start = self.start_time
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """ Time the enclosed block and add it to the cumulative time of stage ``name``. """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - start)
+
+    def add_stage_time(self, name, seconds):
+        """ Add an externally measured duration to stage ``name``. """
+        with self._lock:
+            self.stage_totals[name] = self.stage_totals.get(name, 0.0) + seconds
+            self.stage_counts[name] = self.stage_counts.get(name, 0) + 1
+            if seconds > self.stage_max.get(name, 0.0):
+                self.stage_max[name] = seconds
+
+    def record_queue_depth(self, name, depth):
+        """ Record the current depth of queue ``name`` and keep track of its maximum. """
+        with self._lock:
+            _, max_depth = self.queue_depths.get(name, (0, 0))
+            self.queue_depths[name] = (depth, max(depth, max_depth))
+
+    def frame_skipped(self):
+        """ Count a frame that was read but not converted (e.g. due to ``speed_multiplier``). """
+        with self._lock:
+            self.frames_skipped += 1
+
+    def frame_done(self, written=True):
+        """ Mark the end of a converted frame, record its wall time and notify the callback. """
+        with self._lock:
+            now = time.perf_counter()
+            frame_time = now - self._frame_start
+            self._frame_start = now
+            self.frame_times.append(frame_time)
+            self.frames_processed += 1
+            if written:
+                self.frames_written += 1
+            frames_processed = self.frames_processed
+        if self.log_level is not None:
+            logger.log(self.log_level, "frame %d done in %.4f s", frames_processed, frame_time)
+        if self.callback is not None:
+            self.callback(self)
+
+    def add_bytes_written(self, num_bytes):
+        """ Add the size of written output to the byte counter. """
+        with self._lock:
+            self.bytes_written += num_bytes
+
+    @property
+    def elapsed(self):
+        """ Seconds since the stats object was created. """
+        return time.perf_counter() - self.start_time
+
+    def progress(self):
+        """ Return a small snapshot of the frame counters, e.g. for streaming progress updates. """
+        elapsed = self.elapsed
+        return {
+            'frames_processed': self.frames_processed,
+            'frames_skipped': self.frames_skipped,
+            'frames_written': self.frames_written,
+            'elapsed': elapsed,
+            'fps': self.frames_processed / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def summary(self):
+        """
+        Summarize all collected measurements.
+        Returns:
+            dict: Counters, elapsed time, frames per second and per-stage total/mean/max timings
+        """
+        elapsed = self.elapsed
+        stages = {}
+        with self._lock:
+            for name, total in self.stage_totals.items():
+                count = self.stage_counts[name]
+                stages[name] = {
+                    'total': total,
+                    'count': count,
+                    'mean': total / count if count else 0.0,
+                    'max': self.stage_max.get(name, 0.0),
+                }
+            queue_depths = {name: {'current': cur, 'max': peak} for name, (cur, peak) in self.queue_depths.items()}
+        return {
+            'elapsed': elapsed,
+            'frames_processed': self.frames_processed,
+            'frames_skipped': self.frames_skipped,
+            'frames_written': self.frames_written,
+            'bytes_written': self.bytes_written,
+            'fps': self.frames_processed / elapsed if elapsed > 0 else 0.0,
+            'stages': stages,
+            'queue_depths': queue_depths,
+        }
+
+    def log_summary(self, level=logging.INFO):
+        """ Write a one-line-per-stage summary to the module logger. """
+        summary = self.summary()
+        logger.log(level, "processed %d frames (%d skipped, %d written, %d bytes) in %.2f s",
+                   summary['frames_processed'], summary['frames_skipped'], summary['frames_written'],
+                   summary['bytes_written'], summary['elapsed'])
+        for name, values in summary['stages'].items():
+            logger.log(level, "  %-12s total %.3f s, mean %.4f s, max %.4f s (%d runs)",
+                       name, values['total'], values['mean'], values['max'], values['count'])
+
+
+def stage(stats, name):
+    """
+    Return a context manager timing stage ``name`` on ``stats``, or a shared no-op if ``stats`` is None.
+    Args:
+        stats (ConversionStats): Stats object or None
+        name (str): Stage name, e.g. 'decode', 'match', 'assemble', 'encode', 'compress'
+    """
+    if stats is None:
+        return _NULL_STAGE
+    return stats.stage(name)
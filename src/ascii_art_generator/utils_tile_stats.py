@@ -0,0 +1,166 @@
+import cv2
+import numpy as np
+
+
+def get_tile_size(width, num_sub_images_width, ascii_aspect_ratio):
+    """
+    Compute the size of one sub-image (tile) in pixels, the same way generate_ascii_art always did.
+    Args:
+        width (int): Width of the input image in pixels
+        num_sub_images_width (int): Number of sub-images in width dimension
+        ascii_aspect_ratio (float): Width / height of the ASCII character images
+    Returns:
+        tuple: (size_sub_image_width, size_sub_image_height)
+    """
+    size_sub_image_width = width // num_sub_images_width
+    assert size_sub_image_width > 0, f"num_sub_images_width ({num_sub_images_width}) must not exceed the image width ({width})"
+    size_sub_image_height = int(size_sub_image_width / ascii_aspect_ratio)
+    assert size_sub_image_height > 0, f"Sub-images of width {size_sub_image_width} are too small for the ASCII aspect ratio"
+    return size_sub_image_width, size_sub_image_height
+
+
+def tile_boundaries(length, tile_size):
+    """ Start positions of all tiles along one axis plus the end of the axis, the last tile may be partial. """
+    num_tiles = int(np.ceil(length / tile_size))
+    return np.minimum(np.arange(num_tiles + 1) * tile_size, length)
+
+
+class TileStatistics:
+    """
+    Summed-area table (integral image) of a grayscale image.
+
+    Built once in O(H * W), after which the mean brightness of every tile for any tile size
+    is available in O(1) per tile, so trying other resolutions does not touch the pixels again.
+
+    The image may also be a reduced-resolution decode (every pixel the average of ``scale`` x ``scale`` pixels
+    of the full image). Tile sizes and boundaries are then still given on the full-resolution grid; boundaries
+    that fall inside a reduced pixel are handled in fixed point (integer part ``b // scale`` plus remainder
+    ``b % scale``) by interpolating the integral image, so every tile covers exactly its full-resolution area.
+
+    Args:
+        gray_image (numpy.ndarray): Grayscale image (H, W)
+        scale (int): Reduction factor of gray_image with respect to the full-resolution image (default: 1)
+        full_size (tuple): (width, height) of the full-resolution image (default: gray_image size times scale)
+    """
+
+    def __init__(self, gray_image, scale=1, full_size=None):
+        reduced_height, reduced_width = gray_image.shape
+        if full_size is None:
+            full_size = (reduced_width * scale, reduced_height * scale)
+        self.width, self.height = full_size
+        self.scale = scale
+        # float64 sums of uint8 pixels stay exact up to 2**53, far beyond any image size
+        self.integral = cv2.integral(gray_image, sdepth=cv2.CV_64F)
+
+    def _fixed_point(self, boundaries, reduced_length):
+        """ Split full-resolution boundaries into reduced pixel index and fractional weight of the next pixel. """
+        index = boundaries // self.scale
+        remainder = boundaries - index * self.scale
+        # Boundaries at or beyond the end of the reduced image snap to its end
+        beyond = index >= reduced_length
+        index = np.where(beyond, reduced_length, index)
+        remainder = np.where(beyond, 0, remainder)
+        return index, np.minimum(index + 1, reduced_length), remainder / self.scale
+
+    def _integral_at(self, ys, xs):
+        """ Integral image at full-resolution boundary positions, bilinear between reduced pixel corners. """
+        if self.scale == 1:
+            return self.integral[ys][:, xs]
+        y0, y1, wy = self._fixed_point(ys, self.integral.shape[0] - 1)
+        x0, x1, wx = self._fixed_point(xs, self.integral.shape[1] - 1)
+        wy = wy[:, None]
+        top = self.integral[y0][:, x0] * (1 - wx) + self.integral[y0][:, x1] * wx
+        bottom = self.integral[y1][:, x0] * (1 - wx) + self.integral[y1][:, x1] * wx
+        return top * (1 - wy) + bottom * wy
+
+    def tile_sums(self, size_sub_image_width, size_sub_image_height):
+        """
+        Compute the pixel sum and pixel count of every tile.
+        For a reduced image both are measured in reduced pixels, their ratio is still the tile mean.
+        Args:
+            size_sub_image_width (int): Tile width in full-resolution pixels
+            size_sub_image_height (int): Tile height in full-resolution pixels
+        Returns:
+            tuple: (sums, counts), both arrays of shape (num_sub_images_height, num_sub_images_width)
+        """
+        ys = tile_boundaries(self.height, size_sub_image_height)
+        xs = tile_boundaries(self.width, size_sub_image_width)
+        corners = self._integral_at(ys, xs)
+        sums = corners[1:, 1:] - corners[:-1, 1:] - corners[1:, :-1] + corners[:-1, :-1]
+        counts = np.outer(np.diff(ys), np.diff(xs))
+        if self.scale != 1:
+            counts = counts / self.scale ** 2
+        return sums, counts
+
+    def tile_means(self, size_sub_image_width, size_sub_image_height):
+        """
+        Compute the mean brightness of every tile, edge tiles are averaged over their partial area.
+        Args:
+            size_sub_image_width (int): Tile width in full-resolution pixels
+            size_sub_image_height (int): Tile height in full-resolution pixels
+        Returns:
+            numpy.ndarray: Mean brightness per tile, shape (num_sub_images_height, num_sub_images_width)
+        """
+        sums, counts = self.tile_sums(size_sub_image_width, size_sub_image_height)
+        return sums / counts
+
+
+def match_glyph_indices(tile_means, brightness_values):
+    """
+    Find for every tile the ASCII character with the closest brightness.
+    Ties are resolved towards the darker character, like ``min`` over the sorted brightness list.
+    Args:
+        tile_means (numpy.ndarray): Mean brightness per tile (any shape)
+        brightness_values (numpy.ndarray): Brightness of every ASCII character, sorted ascending
+    Returns:
+        numpy.ndarray: Index into ``brightness_values`` per tile, same shape as ``tile_means``
+    """
+    brightness_values = np.asarray(brightness_values, dtype=np.float64)
+    if len(brightness_values) == 1:
+        return np.zeros(np.shape(tile_means), dtype=np.intp)
+    right = np.clip(np.searchsorted(brightness_values, tile_means), 1, len(brightness_values) - 1)
+    left = right - 1
+    use_left = np.abs(tile_means - brightness_values[left]) <= np.abs(brightness_values[right] - tile_means)
+    indices = np.where(use_left, left, right)
+    # Characters with equal brightness all match equally well, always pick the first of them
+    first_of_equal = np.searchsorted(brightness_values, brightness_values, side='left')
+    return first_of_equal[indices]
+
+
+def batch_tile_means(gray_frames, size_sub_image_width, size_sub_image_height):
+    """
+    Compute the mean brightness of every tile of a whole batch of frames in one pass.
+    Args:
+        gray_frames (numpy.ndarray): Grayscale frames of shape (N, H, W)
+        size_sub_image_width (int): Tile width in pixels
+        size_sub_image_height (int): Tile height in pixels
+    Returns:
+        numpy.ndarray: Mean brightness per tile, shape (N, num_sub_images_height, num_sub_images_width)
+    """
+    _, height, width = gray_frames.shape
+    ys = tile_boundaries(height, size_sub_image_height)
+    xs = tile_boundaries(width, size_sub_image_width)
+    # Sum the columns of every tile first, then the rows; integer sums are exact like the integral image
+    column_sums = np.add.reduceat(gray_frames, xs[:-1], axis=2, dtype=np.uint32)
+    sums = np.add.reduceat(column_sums, ys[:-1], axis=1, dtype=np.uint64)
+    counts = np.outer(np.diff(ys), np.diff(xs))
+    return sums / counts
+
+
+def assemble_glyphs(glyph_indices, glyph_stack, height, width):
+    """
+    Build the ASCII art image by placing one scaled ASCII image per tile.
+    Args:
+        glyph_indices (numpy.ndarray): Index into ``glyph_stack`` per tile, shape (num_sub_images_height, num_sub_images_width)
+                                       or (N, num_sub_images_height, num_sub_images_width) for a batch of frames
+        glyph_stack (numpy.ndarray): Scaled ASCII images, shape (num_glyphs, size_sub_image_height, size_sub_image_width)
+        height (int): Height of the output image, partial edge tiles are cropped
+        width (int): Width of the output image, partial edge tiles are cropped
+    Returns:
+        numpy.ndarray: ASCII art image of shape (height, width), or (N, height, width) for a batch
+    """
+    *batch_shape, rows, cols = glyph_indices.shape
+    _, glyph_height, glyph_width = glyph_stack.shape
+    tiles = glyph_stack[glyph_indices]
+    ascii_art_image = tiles.swapaxes(-3, -2).reshape(*batch_shape, rows * glyph_height, cols * glyph_width)
+    return np.ascontiguousarray(ascii_art_image[..., :height, :width])
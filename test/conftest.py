@@ -0,0 +1,18 @@
+import cv2
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def write_test_video():
+    """ Return a function writing a short video of a moving horizontal gradient, as MJPG for .avi and mp4v otherwise. """
+
+    def write(path, num_frames=12, size=(160, 96)):
+        fourcc = cv2.VideoWriter_fourcc(*'MJPG') if str(path).lower().endswith('.avi') else cv2.VideoWriter_fourcc(*'mp4v')
+        writer = cv2.VideoWriter(str(path), fourcc, 10, size)
+        gradient = np.tile(np.linspace(0, 255, size[0], dtype=np.uint8), (size[1], 1))
+        for k in range(num_frames):
+            writer.write(cv2.cvtColor(np.roll(gradient, 7 * k, axis=1), cv2.COLOR_GRAY2BGR))
+        writer.release()
+
+    return write
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from contextlib import aclosing
+
+from ascii_art_generator.ascii_art_generator_async import AsyncAsciiConverter
+from ascii_art_generator.utils_metrics import ConversionStats
+
+
+def test_iter_video_streams_progress(tmp_path, write_test_video):
+    input_path = tmp_path / 'input.mp4'
+    write_test_video(input_path)
+
+    async def run():
+        async with AsyncAsciiConverter(max_concurrency=1) as converter:
+            return [progress async for progress in converter.iter_video_to_ascii(
+                str(input_path), str(tmp_path / 'output.mp4'), num_sub_images_width=20, compress_output=False)]
+
+    updates = asyncio.run(run())
+    assert updates[-1]['done'] and updates[-1]['success']
+    assert [update['frames_written'] for update in updates[:-1]] == list(range(1, len(updates)))
+
+
+def test_cancel_stops_video_conversion(tmp_path, write_test_video):
+    input_path = tmp_path / 'input.mp4'
+    write_test_video(input_path, num_frames=60)
+    # Slow the worker down so the cancellation arrives mid-stream
+    stats = ConversionStats(callback=lambda _: time.sleep(0.01))
+
+    async def run():
+        async with AsyncAsciiConverter(max_concurrency=1) as converter:
+            frames_seen = []
+
+            async def consume():
+                async for progress in converter.iter_video_to_ascii(
+                        str(input_path), str(tmp_path / 'output.mp4'), num_sub_images_width=20, compress_output=False,
+                        stats=stats):
+                    frames_seen.append(progress['frames_written'])
+
+            task = asyncio.create_task(consume())
+            while not frames_seen:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            return frames_seen
+
+    frames_seen = asyncio.run(run())
+    assert frames_seen
+    assert stats.frames_written < 60
+
+
+def test_break_with_aclosing_stops_video_conversion(tmp_path, write_test_video):
+    input_path = tmp_path / 'input.mp4'
+    write_test_video(input_path, num_frames=60)
+    stats = ConversionStats(callback=lambda _: time.sleep(0.01))
+
+    async def run():
+        async with AsyncAsciiConverter(max_concurrency=1) as converter:
+            updates = converter.iter_video_to_ascii(str(input_path), str(tmp_path / 'output.mp4'), num_sub_images_width=20,
+                                                    compress_output=False, stats=stats)
+            async with aclosing(updates):
+                async for progress in updates:
+                    if progress['frames_written'] >= 3:
+                        break
+            # Closing waited for the worker, so the count no longer changes
+            return stats.frames_written
+
+    frames_written = asyncio.run(run())
+    assert 3 <= frames_written < 60
+    assert stats.frames_written == frames_written
+
+
+def test_slow_consumer_pauses_video_conversion(tmp_path, write_test_video):
+    input_path = tmp_path / 'input.mp4'
+    write_test_video(input_path, num_frames=40)
+    stats = ConversionStats()
+
+    async def run():
+        converter = AsyncAsciiConverter(max_concurrency=1)
+        converter.progress_queue_size = 4
+        lead = []
+        async for progress in converter.iter_video_to_ascii(str(input_path), str(tmp_path / 'output.mp4'),
+                                                             num_sub_images_width=20, compress_output=False,
+                                                             stats=stats):
+            if not progress.get('done'):
+                lead.append(stats.frames_written - progress['frames_written'])
+                await asyncio.sleep(0.02)
+        await converter.aclose()
+        return lead
+
+    lead = asyncio.run(run())
+    assert len(lead) == 40
+    # The worker can only run ahead by the queued messages plus the one it is waiting to put
+    assert max(lead) <= 4 + 1
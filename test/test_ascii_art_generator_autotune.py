@@ -0,0 +1,69 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from ascii_art_generator import ascii_art_generator_autotune
+from ascii_art_generator.ascii_art_generator_autotune import (ThroughputController, calibrate_video_settings,
+                                                              convert_video_to_ascii_tuned)
+from ascii_art_generator.ascii_art_generator_video import convert_video_to_ascii
+from ascii_art_generator.utils_glyph_video import GlyphVideoReader
+
+
+def test_controller_trades_batch_size_then_width(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(ascii_art_generator_autotune.time, 'perf_counter', lambda: clock[0])
+    controller = ThroughputController(target_fps=100, num_sub_images_width=80, batch_size=8, max_batch_size=16,
+                                      window_frames=8)
+
+    def run_batch(fps):
+        clock[0] += controller.batch_size / fps
+        return controller.update(controller.batch_size)
+
+    assert run_batch(50) == (80, 16)   # too slow: larger batches first
+    assert run_batch(50) == (40, 16)   # batch size exhausted: lower the width
+    assert run_batch(300) == (46, 16)  # plenty of headroom: raise the width again
+    assert run_batch(100) == (46, 16)  # on target
+    assert [entry['num_sub_images_width'] for entry in controller.history] == [80, 40, 46]
+
+
+def test_workers_write_same_frames(tmp_path, write_test_video):
+    input_path = str(tmp_path / 'input.avi')
+    write_test_video(input_path)
+    outputs = []
+    for num_workers in (1, 3):
+        output_path = str(tmp_path / f'output_{num_workers}.agv')
+        assert convert_video_to_ascii(input_path, output_path, num_sub_images_width=20, show_progress=False,
+                                      verbose=False, batch_size=2, num_workers=num_workers)
+        with GlyphVideoReader(output_path) as reader:
+            outputs.append(np.stack(list(reader)))
+    assert outputs[0].shape[0] == 12
+    assert (outputs[0] == outputs[1]).all()
+
+
+def test_calibration_report_and_cache(tmp_path, write_test_video):
+    input_path = str(tmp_path / 'input.avi')
+    write_test_video(input_path)
+    report = calibrate_video_settings(input_path, time_budget=1000, num_sub_images_width=40,
+                                      candidate_batch_sizes=(1, 4), candidate_workers=(1, 2), sample_frames=8)
+    assert report['meets_target']
+    assert report['settings']['num_sub_images_width'] == 40
+    assert report['target_fps'] == report['source']['frames_to_convert'] / 1000
+    json.dumps(report)
+
+    cache_path = str(tmp_path / 'calibration.json')
+    for cached in (False, True):
+        success, report = convert_video_to_ascii_tuned(input_path, str(tmp_path / 'output.avi'), target_fps=1,
+                                                       num_sub_images_width=40, calibration_cache=cache_path,
+                                                       sample_frames=8, compress_output=False, show_progress=False,
+                                                       verbose=False)
+        assert success and report['cached'] == cached
+        assert report['run']['frames_processed'] == 12
+    assert os.path.exists(cache_path)
+
+
+def test_tuned_conversion_rejects_tuned_options(tmp_path):
+    with pytest.raises(AssertionError, match='batch_size, num_workers are set by the calibration'):
+        convert_video_to_ascii_tuned(str(tmp_path / 'input.avi'), str(tmp_path / 'output.avi'), target_fps=1,
+                                     num_workers=2, batch_size=4)
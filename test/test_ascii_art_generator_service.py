@@ -0,0 +1,83 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import cv2
+import numpy as np
+import pytest
+
+from ascii_art_generator.ascii_art_generator_service import ConversionService, ServiceBusy, create_server
+
+
+def test_job_slot_rejects_when_queue_is_full():
+    service = ConversionService(max_workers=1, max_queue=0)
+    with service.job_slot():
+        assert service.status()['active_jobs'] == 1
+        with pytest.raises(ServiceBusy):
+            with service.job_slot():
+                pass
+    assert service.status()['active_jobs'] == 0
+
+
+def test_server_converts_posted_image():
+    service = ConversionService(max_workers=1, max_queue=1)
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base_url}/health") as response:
+            assert json.loads(response.read())['status'] == 'ok'
+
+        image = np.tile(np.linspace(0, 255, 160, dtype=np.uint8), (90, 1))
+        _, encoded = cv2.imencode('.png', image)
+        request = urllib.request.Request(f"{base_url}/image?num_sub_images_width=20", data=encoded.tobytes(),
+                                         headers={'Content-Type': 'image/png'})
+        with urllib.request.urlopen(request) as response:
+            assert response.headers['Content-Type'] == 'image/png'
+            ascii_art = cv2.imdecode(np.frombuffer(response.read(), dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        assert ascii_art.shape == image.shape
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_server_reports_invalid_jobs(tmp_path, write_test_video):
+    service = ConversionService(max_workers=1, max_queue=1)
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    image_path = str(tmp_path / 'input.png')
+    cv2.imwrite(image_path, np.tile(np.linspace(0, 255, 160, dtype=np.uint8), (90, 1)))
+
+    def post_json(endpoint, job):
+        request = urllib.request.Request(f"http://127.0.0.1:{server.server_address[1]}{endpoint}",
+                                         data=json.dumps(job).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request)
+        return error.value.code, json.loads(error.value.read())['error']
+
+    try:
+        status, message = post_json('/image', {'image_path': image_path, 'num_sub_images_width': 20,
+                                               'output_path': str(tmp_path / 'missing' / 'out.png')})
+        assert status == 400 and 'Could not write image' in message
+        status, message = post_json('/image', {'image_path': image_path, 'ascii_images_dir': str(tmp_path / 'missing')})
+        assert status == 400
+        status, message = post_json('/video', {'input_video_path': 'in.mp4', 'output_video_path': 'out.mp4',
+                                               'num_sub_images_width': 3.5})
+        assert status == 400 and 'num_sub_images_width' in message
+        status, message = post_json('/video', {'input_video_path': str(tmp_path / 'missing.avi'),
+                                               'output_video_path': str(tmp_path / 'out.mp4')})
+        assert status == 400 and 'does not exist' in message
+        input_path = str(tmp_path / 'input.avi')
+        write_test_video(input_path)
+        for job in ({'output_video_path': str(tmp_path / 'out.gif')}, {'speed_multiplier': 0.5},
+                    {'start_time': 2, 'end_time': 1}):
+            status, _ = post_json('/video', dict({'input_video_path': input_path,
+                                                  'output_video_path': str(tmp_path / 'out.mp4')}, **job))
+            assert status == 400
+    finally:
+        server.shutdown()
+        server.server_close()
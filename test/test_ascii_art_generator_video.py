@@ -0,0 +1,42 @@
+import cv2
+import numpy as np
+
+from ascii_art_generator.ascii_art_generator_video import (VideoOutputSpec, convert_video_to_ascii,
+                                                           convert_video_to_ascii_multi)
+from ascii_art_generator.utils_glyph_video import GlyphVideoReader
+
+
+def read_glyph_video(path):
+    with GlyphVideoReader(path) as reader:
+        return np.stack(list(reader))
+
+
+def test_multi_output_matches_separate_runs(tmp_path, write_test_video):
+    input_path = str(tmp_path / 'input.avi')
+    write_test_video(input_path, num_frames=8)
+    quiet = dict(show_progress=False, verbose=False)
+    results = convert_video_to_ascii_multi(input_path, [
+        VideoOutputSpec(str(tmp_path / 'wide.agv'), num_sub_images_width=40),
+        dict(output_video_path=str(tmp_path / 'narrow.agv'), num_sub_images_width=16),
+        dict(output_video_path=str(tmp_path / 'thumbnail.avi'), num_sub_images_width=16, output_width=80,
+             compress_output=False),
+    ], **quiet)
+    assert results == [True, True, True]
+
+    for name, num_sub_images_width in (('wide', 40), ('narrow', 16)):
+        single_path = str(tmp_path / f'{name}_single.agv')
+        assert convert_video_to_ascii(input_path, single_path, num_sub_images_width=num_sub_images_width, **quiet)
+        assert (read_glyph_video(str(tmp_path / f'{name}.agv')) == read_glyph_video(single_path)).all()
+
+    cap = cv2.VideoCapture(str(tmp_path / 'thumbnail.avi'))
+    assert (cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == (80, 48)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 8
+    cap.release()
+
+
+def test_invalid_width_fails_without_raising(tmp_path, write_test_video):
+    input_path = str(tmp_path / 'input.avi')
+    write_test_video(input_path)
+    # 160 pixels cannot hold 200 characters per row, the error is reported and all resources are released
+    assert not convert_video_to_ascii(input_path, str(tmp_path / 'output.agv'), num_sub_images_width=200,
+                                      show_progress=False, verbose=False)
@@ -0,0 +1,109 @@
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from ascii_art_generator import ascii_art_generator_image
+from ascii_art_generator.ascii_art_generator_image import generate_ascii_art, generate_ascii_art_progressive
+from ascii_art_generator.utils_decode import load_tile_statistics, plan_image_decode
+from ascii_art_generator.utils_metrics import ConversionStats
+from ascii_art_generator.utils_tile_stats import TileStatistics, get_tile_size
+
+ASCII_IMAGES_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'ascii_art_generator', 'ascii_images')
+
+
+def write_test_image(path, size=(1200, 800)):
+    rng = np.random.default_rng(5)
+    image = cv2.resize(rng.integers(0, 256, size=(16, 24, 3), dtype=np.uint8), size, interpolation=cv2.INTER_CUBIC)
+    cv2.imwrite(str(path), image)
+
+
+def test_plan_reduces_jpeg_only_for_large_tiles(tmp_path):
+    jpeg_path, png_path = tmp_path / 'image.jpg', tmp_path / 'image.png'
+    write_test_image(jpeg_path)
+    write_test_image(png_path)
+    assert plan_image_decode(str(jpeg_path), 10, 1.0) == (8, (1200, 800))
+    assert plan_image_decode(str(jpeg_path), 30, 1.0) == (4, (1200, 800))
+    assert plan_image_decode(str(jpeg_path), 200, 1.0) == (1, (1200, 800))
+    assert plan_image_decode(str(png_path), 10, 1.0) == (1, (1200, 800))
+
+
+def test_reduced_decode_tile_means_stay_within_tolerance(tmp_path):
+    path = tmp_path / 'image.jpg'
+    write_test_image(path)
+    tile_statistics, gray_image, scale = load_tile_statistics(str(path), 15, 0.8)
+    assert scale == 8 and gray_image.shape == (100, 150)
+    assert (tile_statistics.width, tile_statistics.height) == (1200, 800)
+
+    size = get_tile_size(1200, 15, 0.8)
+    full = TileStatistics(cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)).tile_means(*size)
+    assert np.abs(tile_statistics.tile_means(*size) - full).max() < 2
+
+
+def test_reduced_decode_tolerance_on_hard_edges(tmp_path):
+    rng = np.random.default_rng(1)
+    image = np.zeros((800, 1200), dtype=np.uint8)
+    for _ in range(60):
+        x, y = rng.integers(0, 1200), rng.integers(0, 800)
+        width, height = rng.integers(10, 300, size=2)
+        image[y:y + height, x:x + width] = rng.integers(0, 256)
+    path = tmp_path / 'edges.jpg'
+    cv2.imwrite(str(path), image)
+    full = TileStatistics(cv2.cvtColor(cv2.imread(str(path)), cv2.COLOR_BGR2GRAY))
+
+    for num_sub_images_width, expected_scale in ((15, 8), (30, 4), (60, 2)):
+        tile_statistics, _, scale = load_tile_statistics(str(path), num_sub_images_width, 0.8)
+        assert scale == expected_scale
+        size = get_tile_size(1200, num_sub_images_width, 0.8)
+        error = np.abs(tile_statistics.tile_means(*size) - full.tile_means(*size))
+        # See MIN_REDUCED_TILE: edges crossing reduced pixels cost up to ~5 gray levels on single tiles
+        assert error.max() < 6
+        assert np.median(error) < 1
+
+
+def test_unreduced_decode_matches_color_decode(tmp_path):
+    path = tmp_path / 'image.jpg'
+    write_test_image(path)
+    tile_statistics, image, scale = load_tile_statistics(str(path), 200, 1.0)
+    assert scale == 1 and image.ndim == 3
+    full = TileStatistics(cv2.cvtColor(cv2.imread(str(path)), cv2.COLOR_BGR2GRAY))
+    assert (tile_statistics.integral == full.integral).all()
+
+
+def test_progressive_preview_uses_cheap_decode(tmp_path):
+    path = str(tmp_path / 'image.jpg')
+    write_test_image(path)
+    stats = ConversionStats()
+    steps = list(generate_ascii_art_progressive(path, ASCII_IMAGES_DIR, 60, stats=stats))
+    assert [width for width, _ in steps] == [15, 30, 60]
+    assert all(image.shape == (800, 1200) for _, image in steps)
+    # The coarse preview and the final result need different decodes
+    assert stats.stage_counts['load_preview'] == 1 and stats.stage_counts['load_image'] == 1
+    final = generate_ascii_art(path, ASCII_IMAGES_DIR, 60, plot_enabled=False, save_enabled=False)
+    assert (steps[-1][1] == final).all()
+
+
+def test_plan_ignores_pil_decompression_bomb_limit(tmp_path, monkeypatch):
+    jpeg_path, png_path = tmp_path / 'image.jpg', tmp_path / 'image.png'
+    write_test_image(jpeg_path)
+    write_test_image(png_path)
+    # Pretend both images are far above PIL's pixel limit, like photos of more than ~179 MP
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+    assert plan_image_decode(str(jpeg_path), 10, 1.0) == (8, (1200, 800))
+    assert plan_image_decode(str(png_path), 10, 1.0) == (1, None)
+    tile_statistics, _, scale = load_tile_statistics(str(png_path), 10, 1.0)
+    assert scale == 1 and (tile_statistics.width, tile_statistics.height) == (1200, 800)
+
+
+def test_plotting_does_not_change_the_output(tmp_path, monkeypatch):
+    shown = []
+    monkeypatch.setattr(ascii_art_generator_image.plt, 'show', lambda: shown.append(ascii_art_generator_image.plt.gcf()))
+    path = str(tmp_path / 'image.jpg')
+    write_test_image(path)
+    plain = generate_ascii_art(path, ASCII_IMAGES_DIR, 15, plot_enabled=False, save_enabled=False)
+    plotted = generate_ascii_art(path, ASCII_IMAGES_DIR, 15, plot_enabled=True, save_enabled=False)
+    assert (plain == plotted).all()
+    # The original panel still shows the full-resolution color image
+    assert shown[0].axes[0].images[0].get_array().shape == (800, 1200, 3)
+    ascii_art_generator_image.plt.close('all')
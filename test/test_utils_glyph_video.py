@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+
+from ascii_art_generator.ascii_art_generator_image import ascii_art_from_array, match_tiles
+from ascii_art_generator.ascii_art_generator_video import open_glyph_video_writer
+from ascii_art_generator.utils_glyph_video import GlyphVideoReader, GlyphVideoWriter, glyph_video_to_text, make_glyph_renderer
+from ascii_art_generator.utils_tile_stats import TileStatistics
+
+ASCII_IMAGES_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'ascii_art_generator', 'ascii_images')
+
+
+def test_writer_reader_round_trip(tmp_path):
+    rng = np.random.default_rng(1)
+    frames = [rng.integers(0, 3, size=(4, 6), dtype=np.uint8) for _ in range(10)]
+    glyph_images = [np.full((5, 3), value, dtype=np.uint8) for value in (0, 128, 255)]
+    path = str(tmp_path / 'video.agv')
+    with GlyphVideoWriter(path, 24, (18, 20), (3, 5), ['ascii_035_#.png', 'ascii_043_+.png', 'ascii_032_space.png'],
+                          glyph_images, chunk_frames=4) as writer:
+        for frame in frames:
+            writer.write(frame)
+
+    with GlyphVideoReader(path) as reader:
+        assert reader.grid_shape == (4, 6)
+        assert reader.glyph_chars == ['#', '+', ' ']
+        decoded = list(reader)
+    assert len(decoded) == len(frames)
+    assert all((a == b).all() for a, b in zip(decoded, frames))
+    assert next(glyph_video_to_text(path)).count('\n') == 3
+
+
+def test_render_at_source_size_matches_direct_conversion(tmp_path):
+    gray_image = np.tile(np.linspace(0, 255, 200, dtype=np.uint8), (120, 1))
+    glyph_indices, _ = match_tiles(TileStatistics(gray_image), ASCII_IMAGES_DIR, 25)
+    path = str(tmp_path / 'video.agv')
+    writer = open_glyph_video_writer(path, 10, (200, 120), 25, ASCII_IMAGES_DIR)
+    writer.write(glyph_indices)
+    writer.release()
+
+    with GlyphVideoReader(path) as reader:
+        render = make_glyph_renderer(reader.glyph_images, reader.tile_size, reader.frame_size)
+        rendered = render(next(iter(reader)))
+        half_size = make_glyph_renderer(reader.glyph_images, reader.tile_size, reader.frame_size, (100, 60))(glyph_indices)
+    assert (rendered == ascii_art_from_array(gray_image, ASCII_IMAGES_DIR, 25)).all()
+    assert half_size.shape == (60, 100)
@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+from ascii_art_generator.utils_metrics import ConversionStats, stage
+
+
+def test_stage_accumulates_time_and_counts():
+    stats = ConversionStats()
+    for _ in range(3):
+        with stats.stage('match'):
+            pass
+    stats.add_stage_time('encode', 0.5)
+    summary = stats.summary()
+    assert summary['stages']['match']['count'] == 3
+    assert summary['stages']['encode']['total'] == pytest.approx(0.5)
+    assert summary['stages']['encode']['max'] == pytest.approx(0.5)
+
+
+def test_stage_helper_is_noop_without_stats():
+    with stage(None, 'decode'):
+        pass
+    stats = ConversionStats()
+    with stage(stats, 'decode'):
+        pass
+    assert stats.stage_counts == {'decode': 1}
+
+
+def test_frame_counters_and_callback():
+    seen = []
+    stats = ConversionStats(callback=lambda s: seen.append(s.frames_written))
+    stats.frame_done()
+    stats.frame_skipped()
+    stats.frame_done(written=False)
+    stats.add_bytes_written(1024)
+    stats.record_queue_depth('frames', 4)
+    stats.record_queue_depth('frames', 1)
+    summary = stats.summary()
+    assert seen == [1, 1]
+    assert summary['frames_processed'] == 2
+    assert summary['frames_skipped'] == 1
+    assert summary['frames_written'] == 1
+    assert summary['bytes_written'] == 1024
+    assert summary['queue_depths']['frames'] == {'current': 1, 'max': 4}
+    assert len(stats.frame_times) == 2
+
+
+def test_concurrent_updates_are_not_lost():
+    stats = ConversionStats()
+
+    def work():
+        for _ in range(2000):
+            stats.add_stage_time('match', 0.001)
+            stats.record_queue_depth('workers', 1)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stats.stage_counts['match'] == 16000
+    assert stats.stage_totals['match'] == pytest.approx(16.0)
@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+
+from ascii_art_generator.utils_tile_stats import TileStatistics, assemble_glyphs, batch_tile_means, match_glyph_indices
+
+
+def test_tile_means_match_direct_mean_including_partial_tiles():
+    rng = np.random.default_rng(0)
+    gray_image = rng.integers(0, 256, size=(53, 71), dtype=np.uint8)
+    tile_statistics = TileStatistics(gray_image)
+    for tile_width, tile_height in [(7, 13), (10, 10), (71, 53), (1, 1)]:
+        means = tile_statistics.tile_means(tile_width, tile_height)
+        for i in range(means.shape[0]):
+            for j in range(means.shape[1]):
+                tile = gray_image[i * tile_height:(i + 1) * tile_height, j * tile_width:(j + 1) * tile_width]
+                assert means[i, j] == np.mean(tile)
+
+
+def test_match_glyph_indices_equals_min_over_sorted_brightness():
+    brightness_values = np.array([10.0, 20.0, 20.0, 40.0, 100.0])
+    tile_means = np.array([[0.0, 15.0, 20.0, 30.0], [35.0, 70.0, 250.0, 19.9]])
+    expected = [[min(range(len(brightness_values)), key=lambda k: abs(brightness_values[k] - m)) for m in row]
+                for row in tile_means]
+    assert match_glyph_indices(tile_means, brightness_values).tolist() == expected
+
+
+def test_assemble_glyphs_crops_edge_tiles():
+    glyph_stack = np.arange(2 * 3 * 2, dtype=np.uint8).reshape(2, 3, 2)
+    glyph_indices = np.array([[0, 1], [1, 0]])
+    ascii_art_image = assemble_glyphs(glyph_indices, glyph_stack, height=5, width=3)
+    assert ascii_art_image.shape == (5, 3)
+    assert (ascii_art_image[:3, :2] == glyph_stack[0]).all()
+    assert (ascii_art_image[:3, 2] == glyph_stack[1][:, 0]).all()
+    assert (ascii_art_image[3:, :2] == glyph_stack[1][:2]).all()
+
+
+def test_batch_tile_means_match_integral_image():
+    rng = np.random.default_rng(2)
+    gray_frames = rng.integers(0, 256, size=(3, 41, 57), dtype=np.uint8)
+    means = batch_tile_means(gray_frames, 8, 12)
+    for frame, frame_means in zip(gray_frames, means):
+        assert (frame_means == TileStatistics(frame).tile_means(8, 12)).all()
+
+
+def test_assemble_glyphs_batch_matches_single_frames():
+    rng = np.random.default_rng(3)
+    glyph_stack = rng.integers(0, 256, size=(4, 5, 3), dtype=np.uint8)
+    glyph_indices = rng.integers(0, 4, size=(2, 3, 4))
+    batch = assemble_glyphs(glyph_indices, glyph_stack, 13, 11)
+    assert batch.shape == (2, 13, 11)
+    for k in range(2):
+        assert (batch[k] == assemble_glyphs(glyph_indices[k], glyph_stack, 13, 11)).all()
+
+
+def test_reduced_tile_statistics_keep_full_resolution_boundaries():
+    rng = np.random.default_rng(4)
+    # Smooth image so that block averages carry the full information
+    gray_image = cv2.resize(rng.integers(0, 256, size=(6, 8), dtype=np.uint8), (320, 240), interpolation=cv2.INTER_LINEAR)
+    reduced = gray_image.reshape(60, 4, 80, 4).mean(axis=(1, 3))
+    reduced_statistics = TileStatistics(reduced, scale=4, full_size=(320, 240))
+    # Tile boundaries inside reduced pixels, partial tiles at the right and bottom edge
+    exact = TileStatistics(gray_image).tile_means(37, 45)
+    approximate = reduced_statistics.tile_means(37, 45)
+    assert approximate.shape == exact.shape
+    assert np.abs(approximate - exact).max() < 1
+    # With tiles aligned to the reduced pixels the means are exact
+    assert np.allclose(reduced_statistics.tile_means(40, 48), TileStatistics(gray_image).tile_means(40, 48))